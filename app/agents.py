@@ -3,7 +3,7 @@ from dotenv import load_dotenv
 from pydantic import BaseModel, Field, ValidationError
 from pydantic_ai import Agent
 from typing import Optional
-from .models import SRSInput
+from .schema import SRSInput, SRS_FIELD_PROMPT_LIST, input_values
 import json
 from pydantic_ai.models.groq import GroqModel
 load_dotenv()
@@ -25,35 +25,7 @@ RULES:
 4. When all information is collected, respond with "All done" in the question field
 
 FIELDS TO COLLECT (ask about these in logical order):
-- project_name
-- srs_version
-- authors
-- creation_date
-- stakeholders
-- expected_release_date
-- overview_summary
-- main_purpose
-- intended_users
-- srs_purpose
-- scope
-- assumptions
-- acronyms
-- problem
-- affected_parties
-- impacts
-- resources
-- constraints
-- mvp
-- ideal_solution
-- deliverables
-- delivery_stages
-- major_features
-- datasheets
-- db_design
-- uiux
-- rabbit_holes
-- out_of_scope
-- restrictions
+""" + SRS_FIELD_PROMPT_LIST + """
 
 STRICT RESPONSE FORMAT (JSON ONLY):
 {
@@ -143,12 +115,14 @@ def validate_response(response) -> ChatOutput:
 # Create agents with enhanced configuration
 srs_chat_agent = Agent(
     AGENT_MODEL,
+    name="srs_chat_agent",
     system_prompt=SRS_BASE_PROMPT,
     output_type=ChatOutput,
 )
 
 srs_structured_agent = Agent(
     AGENT_MODEL,
+    name="srs_structured_agent",
     output_type=SRSInput,
 )
 
@@ -159,84 +133,103 @@ srs_agent = Agent(
 # Format prompt for SRS document generation
 srs_agent = Agent(
     AGENT_MODEL,
+    name="srs_agent",
     retries=5,
     )
 
-def format_srs_prompt(data: SRSInput) -> str:
-    """Generate a comprehensive SRS document utilizing all fields"""
-    return f"""
+SRS_PROMPT_HEADER = """
 You are a senior technical writer creating a formal Software Requirements Specification document.
 Produce a complete, professional SRS that would span 4-12 pages when formatted, using all provided information.
 
 STRUCTURE THE DOCUMENT AS FOLLOWS:
 
-# 1. PROJECT IDENTIFICATION
+"""
+
+# Document sections: (number, title, SRSInput fields the section depends on, template)
+SRS_SECTIONS = [
+    (
+        1,
+        "PROJECT IDENTIFICATION",
+        ("project_name", "srs_version", "creation_date", "authors", "stakeholders", "expected_release_date"),
+        """# 1. PROJECT IDENTIFICATION
 
 ## 1.1 Basic Metadata
-- **Project Name**: {data.project_name}
+- **Project Name**: {project_name}
   - Alternative names/codenames
   - Project classification (internal/client-facing/open-source)
   
-- **SRS Version**: {data.srs_version}
+- **SRS Version**: {srs_version}
   - Version control methodology
   - Change management process
 
-- **Creation Date**: {data.creation_date}
+- **Creation Date**: {creation_date}
   - Revision history
   - Planned review cycles
 
 ## 1.2 Authorship & Stakeholders
-- **Authors**: {data.authors}
+- **Authors**: {authors}
   - For each author:
     * Role and responsibilities
     * Contact information
     * Organizational unit
 
-- **Stakeholders**: {data.stakeholders}
+- **Stakeholders**: {stakeholders}
   - Stakeholder matrix:
     * Interest level
     * Influence level
     * Communication needs
   - Decision-making hierarchy
 
-- **Expected Release**: {data.expected_release_date}
+- **Expected Release**: {expected_release_date}
   - Key milestones
   - Critical path analysis
   - Risk mitigation timeline
 
-# 2. INTRODUCTION
+""",
+    ),
+    (
+        2,
+        "INTRODUCTION",
+        ("srs_purpose", "main_purpose", "scope", "overview_summary", "problem"),
+        """# 2. INTRODUCTION
 
 ## 2.1 Purpose & Scope
-- **Document Purpose**: {data.srs_purpose}
+- **Document Purpose**: {srs_purpose}
   - Intended usage scenarios
   - Compliance requirements
   - Reference documents
 
-- **System Purpose**: {data.main_purpose}
+- **System Purpose**: {main_purpose}
   - Business objectives
   - Success metrics (KPIs)
   - Value proposition
 
-- **Scope**: {data.scope}
+- **Scope**: {scope}
   - System boundaries
   - Interfaces with other systems
   - Scope visualization (diagram description)
 
 ## 2.2 Background
-- **Overview**: {data.overview_summary}
+- **Overview**: {overview_summary}
   - Business context
   - Technical landscape
   - Strategic alignment
 
-- **Problem Statement**: {data.problem}
+- **Problem Statement**: {problem}
   - Root cause analysis
   - Impact quantification
   - Current workarounds
 
-# 3. DEFINITIONS & REFERENCE
+""",
+    ),
+    (
+        3,
+        "DEFINITIONS & REFERENCE",
+        ("acronyms",),
+        """# 3. DEFINITIONS & REFERENCE
 
 ## 3.1 Terminology
-- **Acronyms**: {data.acronyms}
+- **Acronyms**: {acronyms}
   - Full definitions
   - Usage context
   - Related terms
@@ -246,9 +239,15 @@ STRUCTURE THE DOCUMENT AS FOLLOWS:
 - Regulatory framework
 - Technical references
 
-# 4. USER CHARACTERISTICS
+""",
+    ),
+    (
+        4,
+        "USER CHARACTERISTICS",
+        ("intended_users", "affected_parties"),
+        """# 4. USER CHARACTERISTICS
 
-- **Intended Users**: {data.intended_users}
+- **Intended Users**: {intended_users}
   - User personas (3-5 detailed profiles)
   - For each:
     * Demographics
@@ -256,52 +255,64 @@ STRUCTURE THE DOCUMENT AS FOLLOWS:
     * Usage patterns
     * Special needs
 
-- **Affected Parties**: {data.affected_parties}
+- **Affected Parties**: {affected_parties}
   - Indirect users
   - Business units impacted
   - External systems affected
 
-# 5. REQUIREMENTS
+""",
+    ),
+    (
+        5,
+        "REQUIREMENTS",
+        ("major_features", "mvp", "db_design", "datasheets", "uiux"),
+        """# 5. REQUIREMENTS
 
 ## 5.1 Functional Requirements
-- **Major Features**: {data.major_features}
+- **Major Features**: {major_features}
   - Feature breakdown:
     * Description
     * User stories
     * Acceptance criteria
     * Dependencies
 
-- **MVP Definition**: {data.mvp}
+- **MVP Definition**: {mvp}
   - Core feature set
   - Minimum viable quality
   - Phase 1 deliverables
 
 ## 5.2 Data Requirements
-- **Database Design**: {data.db_design}
+- **Database Design**: {db_design}
   - Entity relationships
   - Data flow diagrams
   - Storage requirements
 
-- **Datasheets**: {data.datasheets}
+- **Datasheets**: {datasheets}
   - Technical specifications
   - Performance characteristics
   - Interface protocols
 
 ## 5.3 Interface Requirements
-- **UI/UX Design**: {data.uiux}
+- **UI/UX Design**: {uiux}
   - Wireframe descriptions
   - Navigation flows
   - Accessibility standards
 
-# 6. CONSTRAINTS
+""",
+    ),
+    (
+        6,
+        "CONSTRAINTS",
+        ("resources", "constraints"),
+        """# 6. CONSTRAINTS
 
 ## 6.1 Technical Constraints
-- **Resources**: {data.resources}
+- **Resources**: {resources}
   - Hardware limitations
   - Software dependencies
   - Team capacity
 
-- **Constraints**: {data.constraints}
+- **Constraints**: {constraints}
   - Architectural decisions
   - Technology stack
   - Integration limitations
@@ -311,59 +322,81 @@ STRUCTURE THE DOCUMENT AS FOLLOWS:
 - Timeline restrictions
 - Compliance requirements
 
-# 7. SOLUTION APPROACH
+""",
+    ),
+    (
+        7,
+        "SOLUTION APPROACH",
+        ("ideal_solution", "deliverables", "delivery_stages"),
+        """# 7. SOLUTION APPROACH
 
 ## 7.1 Ideal Solution
-- **Vision**: {data.ideal_solution}
+- **Vision**: {ideal_solution}
   - Future state architecture
   - Scalability considerations
   - Innovation opportunities
 
 ## 7.2 Deliverables
-- **Deliverables**: {data.deliverables}
+- **Deliverables**: {deliverables}
   - Artifact list with descriptions
   - Quality metrics
   - Acceptance criteria
 
-- **Delivery Stages**: {data.delivery_stages}
+- **Delivery Stages**: {delivery_stages}
   - Phase definitions
   - Milestone schedule
   - Success indicators
 
-# 8. SUPPLEMENTAL INFORMATION
+""",
+    ),
+    (
+        8,
+        "SUPPLEMENTAL INFORMATION",
+        ("assumptions", "rabbit_holes", "out_of_scope", "restrictions"),
+        """# 8. SUPPLEMENTAL INFORMATION
 
 ## 8.1 Assumptions
-- **Assumptions**: {data.assumptions}
+- **Assumptions**: {assumptions}
   - For each assumption:
     * Rationale
     * Validation method
     * Impact if invalid
 
 ## 8.2 Future Considerations
-- **Rabbit Holes**: {data.rabbit_holes}
+- **Rabbit Holes**: {rabbit_holes}
   - Potential extensions
   - Research areas
   - Innovation opportunities
 
 ## 8.3 Limitations
-- **Out of Scope**: {data.out_of_scope}
+- **Out of Scope**: {out_of_scope}
   - Specific exclusions
   - Justification
   - Future consideration
 
-- **Restrictions**: {data.restrictions}
+- **Restrictions**: {restrictions}
   - Technical prohibitions
   - Business limitations
   - Compliance boundaries
 
-# 9. IMPACT ANALYSIS
+""",
+    ),
+    (
+        9,
+        "IMPACT ANALYSIS",
+        ("impacts",),
+        """# 9. IMPACT ANALYSIS
 
-- **Impacts**: {data.impacts}
+- **Impacts**: {impacts}
   - Business processes affected
   - Technical debt implications
   - Organizational change required
 
-DOCUMENTATION STANDARDS:
+""",
+    ),
+]
+
+SRS_PROMPT_FOOTER = """DOCUMENTATION STANDARDS:
 1. Use IEEE SRS format conventions
 2. Number all requirements (REQ-001, etc.)
 3. Include traceability matrix
@@ -395,4 +428,29 @@ The renderer will automatically:
 - Consistent bullet point formatting
 - Clear separation of concerns
 - Unambiguous requirement statements
-"""
\ No newline at end of file
+"""
+
+def format_srs_prompt(data: SRSInput) -> str:
+    """Generate a comprehensive SRS document utilizing all fields"""
+    values = input_values(data)
+    sections = "".join(template.format(**values) for _, _, _, template in SRS_SECTIONS)
+    return SRS_PROMPT_HEADER + sections + SRS_PROMPT_FOOTER
+
+SRS_SECTION_PROMPT_HEADER = """
+You are a senior technical writer revising one section of an existing Software Requirements Specification document.
+The other sections of the document are unchanged and must not be rewritten.
+
+REWRITE ONLY THE FOLLOWING SECTION, KEEPING ITS NUMBER AND TITLE:
+
+"""
+
+def format_srs_section_prompt(data: SRSInput, number: int) -> str:
+    """Generate a prompt that rewrites a single numbered SRS section"""
+    values = input_values(data)
+    template = next(template for n, _, _, template in SRS_SECTIONS if n == number)
+    return (
+        SRS_SECTION_PROMPT_HEADER
+        + template.format(**values)
+        + SRS_PROMPT_FOOTER
+        + f"\nReturn only the Markdown for section {number}, starting with its '# {number}.' heading.\n"
+    )
@@ -0,0 +1,191 @@
+import logging
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from .cache import session_cache
+from .database import engine, mark_written
+from .models import SRSSession, TenantUsage
+
+load_dotenv()
+
+# Local tokenizer file (tokenizer.json) for prompt accounting; without it tokens are estimated from length
+TOKENIZER_PATH = os.getenv("TOKENIZER_PATH")
+# Largest prompt sent in a single call; interview history is trimmed to fit
+PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "24000"))
+# Lifetime tokens per session and tokens per tenant per UTC day (0 disables)
+SESSION_TOKEN_BUDGET = int(os.getenv("SESSION_TOKEN_BUDGET", "0"))
+TENANT_DAILY_TOKEN_BUDGET = int(os.getenv("TENANT_DAILY_TOKEN_BUDGET", "0"))
+
+# Fallback estimate when no tokenizer is configured
+CHARS_PER_TOKEN = 4
+
+HISTORY_TRIMMED_MARKER = "[Earlier conversation omitted]\n"
+
+logger = logging.getLogger(__name__)
+
+_tokenizer = None
+if TOKENIZER_PATH:
+    try:
+        from tokenizers import Tokenizer
+        _tokenizer = Tokenizer.from_file(TOKENIZER_PATH)
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer from {TOKENIZER_PATH}, estimating tokens from length: {e}")
+
+def count_tokens(text: str) -> int:
+    if _tokenizer is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(_tokenizer.encode(text, add_special_tokens=False).ids)
+
+@lru_cache(maxsize=4096)
+def _count_piece_tokens(text: str) -> int:
+    return count_tokens(text)
+
+def count_piece_tokens(text: str) -> int:
+    """Token count of a history turn or prompt header, memoized because they recur on every turn.
+
+    Whole prompts are not cached: they are large and rarely repeat.
+    """
+    if _tokenizer is None:
+        # The length estimate is cheaper than hashing the cache key
+        return count_tokens(text)
+    return _count_piece_tokens(text)
+
+class PromptTooLarge(HTTPException):
+    def __init__(self, tokens: int):
+        super().__init__(
+            status_code=413,
+            detail=f"Prompt is {tokens} tokens, the limit is {PROMPT_MAX_TOKENS}"
+        )
+
+class TokenBudgetExceeded(HTTPException):
+    def __init__(self, scope: str, budget: int):
+        super().__init__(status_code=429, detail=f"{scope} token budget of {budget} exhausted")
+
+def today() -> str:
+    return datetime.utcnow().date().isoformat()
+
+def tenant_tokens_today(db: Session, tenant_id: str) -> int:
+    usage = db.get(TenantUsage, (tenant_id, today()))
+    return usage.prompt_tokens + usage.completion_tokens if usage else 0
+
+def remaining_tokens(db: Session, session: SRSSession) -> Optional[int]:
+    """Tokens the session may still use under its own and its tenant's budget (None when unlimited)."""
+    remaining = []
+    if SESSION_TOKEN_BUDGET:
+        remaining.append(SESSION_TOKEN_BUDGET - session.prompt_tokens - session.completion_tokens)
+    if TENANT_DAILY_TOKEN_BUDGET:
+        remaining.append(TENANT_DAILY_TOKEN_BUDGET - tenant_tokens_today(db, session.tenant_id))
+    return max(0, min(remaining)) if remaining else None
+
+def admit(db: Session, session: SRSSession, prompt_tokens: int):
+    """Reject a call whose prompt is too large or would exceed the session's or tenant's budget."""
+    if prompt_tokens > PROMPT_MAX_TOKENS:
+        raise PromptTooLarge(prompt_tokens)
+    if SESSION_TOKEN_BUDGET and session.prompt_tokens + session.completion_tokens + prompt_tokens > SESSION_TOKEN_BUDGET:
+        raise TokenBudgetExceeded("Session", SESSION_TOKEN_BUDGET)
+    if TENANT_DAILY_TOKEN_BUDGET and tenant_tokens_today(db, session.tenant_id) + prompt_tokens > TENANT_DAILY_TOKEN_BUDGET:
+        raise TokenBudgetExceeded(f"Tenant '{session.tenant_id}' daily", TENANT_DAILY_TOKEN_BUDGET)
+
+def history_limit(db: Session, session: SRSSession) -> int:
+    remaining = remaining_tokens(db, session)
+    return PROMPT_MAX_TOKENS if remaining is None else min(PROMPT_MAX_TOKENS, remaining)
+
+def trim_history(header: str, turns: List[str], limit: int) -> Optional[str]:
+    """Keep the header and as many of the most recent turns as fit in `limit` tokens.
+
+    Returns None when not even the latest turn fits.
+    """
+    counts = [count_piece_tokens(turn) for turn in turns]
+    used = count_piece_tokens(header)
+    if used + sum(counts) <= limit:
+        return header + "".join(turns)
+    used += count_piece_tokens(HISTORY_TRIMMED_MARKER)
+    kept = 0
+    for count in reversed(counts):
+        used += count
+        if used > limit:
+            break
+        kept += 1
+    if not kept:
+        return None
+    return header + HISTORY_TRIMMED_MARKER + "".join(turns[-kept:])
+
+def completion_tokens(result) -> int:
+    """Output tokens reported by the provider, or counted locally when it reports none."""
+    usage = result.usage()
+    if usage.response_tokens:
+        return usage.response_tokens
+    output = result.output
+    return count_tokens(output if isinstance(output, str) else output.model_dump_json())
+
+def record_usage(db: Session, session: SRSSession, prompt_tokens: int, completion_tokens: int):
+    """Add a call's tokens to the session and tenant counters; committed with the caller's transaction."""
+    add_usage(db, session.session_id, session.tenant_id, prompt_tokens, completion_tokens)
+
+def record_call_usage(session_id: str, tenant_id: str, prompt_tokens: int, completion_tokens: int):
+    """Same as `record_usage`, in its own transaction (for calls made outside a request's session)."""
+    with Session(engine) as db:
+        add_usage(db, session_id, tenant_id, prompt_tokens, completion_tokens)
+        db.commit()
+    mark_written(session_id)
+    session_cache.invalidate(session_id)
+
+def add_usage(db: Session, session_id: str, tenant_id: str, prompt_tokens: int, completion_tokens: int):
+    db.execute(
+        update(SRSSession)
+        .where(SRSSession.session_id == session_id)
+        .values(
+            prompt_tokens=SRSSession.prompt_tokens + prompt_tokens,
+            completion_tokens=SRSSession.completion_tokens + completion_tokens,
+            # The counters are part of the session representation, so its ETag must change
+            updated_at=datetime.utcnow(),
+        )
+    )
+    values = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "calls": 1}
+    key = {"tenant_id": tenant_id, "day": today()}
+    backend = db.get_bind().dialect.name
+    if backend in ("postgresql", "sqlite"):
+        insert = postgresql.insert if backend == "postgresql" else sqlite.insert
+        statement = insert(TenantUsage).values(**key, **values)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["tenant_id", "day"],
+            set_={name: getattr(TenantUsage, name) + getattr(statement.excluded, name) for name in values},
+        ))
+        return
+    usage = db.get(TenantUsage, (key["tenant_id"], key["day"])) or TenantUsage(**key)
+    for name, amount in values.items():
+        setattr(usage, name, getattr(usage, name) + amount)
+    db.add(usage)
+
+def session_usage(db: Session, session: SRSSession) -> dict:
+    total = session.prompt_tokens + session.completion_tokens
+    return {
+        "session_id": session.session_id,
+        "tenant_id": session.tenant_id,
+        "prompt_tokens": session.prompt_tokens,
+        "completion_tokens": session.completion_tokens,
+        "total_tokens": total,
+        "budget": SESSION_TOKEN_BUDGET or None,
+        "remaining": remaining_tokens(db, session),
+    }
+
+def tenant_usage(db: Session, tenant_id: str, days: int) -> dict:
+    rows = db.exec(
+        select(TenantUsage)
+        .where(TenantUsage.tenant_id == tenant_id)
+        .order_by(TenantUsage.day.desc())
+        .limit(days)
+    ).all()
+    used_today = next((row.prompt_tokens + row.completion_tokens for row in rows if row.day == today()), 0)
+    return {
+        "tenant_id": tenant_id,
+        "daily_budget": TENANT_DAILY_TOKEN_BUDGET or None,
+        "remaining_today": max(0, TENANT_DAILY_TOKEN_BUDGET - used_today) if TENANT_DAILY_TOKEN_BUDGET else None,
+        "days": [row.model_dump() for row in rows],
+    }
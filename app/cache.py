@@ -0,0 +1,170 @@
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Hot session cache: an in-process LRU in front of an optional shared Redis tier
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "1024"))
+# Bounds how long another worker's stale local copy can survive an invalidation
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "5"))
+SESSION_CACHE_REDIS_TTL_SECONDS = int(os.getenv("SESSION_CACHE_REDIS_TTL_SECONDS", "300"))
+REDIS_URL = os.getenv("REDIS_URL")
+
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+class SessionCache:
+    """Read-through cache of serialized SRSSession rows keyed by session id.
+
+    Entries are plain JSON dicts; `updated_at` doubles as the version stamp used for ETags.
+    Every invalidation bumps the session's version (in this process and in Redis). A read
+    takes the version before it loads the row and only fills the cache if the version is
+    unchanged, so a write that lands in between is never shadowed by the stale row.
+    Redis failures are logged and treated as misses so the cache never fails a request.
+    """
+
+    def __init__(self, max_size: int, ttl: float, redis_url: Optional[str] = None):
+        self.local = LRUCache(max_size, ttl)
+        # Local versions of recently invalidated sessions; older ones share `_version_floor`
+        self._versions = OrderedDict()
+        self._version_floor = 0
+        self._max_versions = max(4 * max_size, 1024)
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self.redis = None
+        if redis_url:
+            import redis
+            self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.1)
+            self._watch_error = redis.WatchError
+
+    def _redis_key(self, session_id: str) -> str:
+        return f"srs:session:{session_id}"
+
+    def _version_key(self, session_id: str) -> str:
+        return f"srs:session:{session_id}:version"
+
+    def _local_version(self, session_id: str) -> int:
+        with self._lock:
+            return self._versions.get(session_id, self._version_floor)
+
+    def _set_local(self, session_id: str, data: dict, local_version: int) -> bool:
+        with self._lock:
+            if self._versions.get(session_id, self._version_floor) != local_version:
+                return False
+            self.local.set(session_id, data)
+            return True
+
+    def version(self, session_id: str) -> Tuple[int, Optional[bytes]]:
+        """Version to pass to `set` for a row about to be read from the database."""
+        remote = None
+        if self.redis is not None:
+            try:
+                remote = self.redis.get(self._version_key(session_id)) or b"0"
+            except Exception as e:
+                logger.warning(f"Session cache read failed: {e}")
+        return self._local_version(session_id), remote
+
+    def get(self, session_id: str) -> Optional[dict]:
+        data = self.local.get(session_id)
+        if data is not None or self.redis is None:
+            return data
+        local_version = self._local_version(session_id)
+        try:
+            raw = self.redis.get(self._redis_key(session_id))
+        except Exception as e:
+            logger.warning(f"Session cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        self._set_local(session_id, data, local_version)
+        return data
+
+    def set(self, session_id: str, data: dict, version: Tuple[int, Optional[bytes]], shared: bool = True):
+        """Cache a row read at `version` unless the session was invalidated since.
+
+        Only cached locally unless `shared` (data read from a lagging replica stays local).
+        """
+        local_version, remote_version = version
+        if self.redis is not None and remote_version is not None:
+            if not self._set_shared(session_id, data, remote_version, shared):
+                return
+        self._set_local(session_id, data, local_version)
+
+    def _set_shared(self, session_id: str, data: dict, remote_version: bytes, shared: bool) -> bool:
+        """Check the Redis version (and write the entry when `shared`); False if it moved on."""
+        try:
+            with self.redis.pipeline() as pipe:
+                # Another worker's invalidation between WATCH and EXEC aborts the write
+                pipe.watch(self._version_key(session_id))
+                if (pipe.get(self._version_key(session_id)) or b"0") != remote_version:
+                    return False
+                if shared:
+                    pipe.multi()
+                    pipe.set(self._redis_key(session_id), json.dumps(data), ex=SESSION_CACHE_REDIS_TTL_SECONDS)
+                    pipe.execute()
+        except self._watch_error:
+            return False
+        except Exception as e:
+            logger.warning(f"Session cache write failed: {e}")
+        return True
+
+    def invalidate(self, session_id: str):
+        with self._lock:
+            self._versions[session_id] = next(self._counter)
+            self._versions.move_to_end(session_id)
+            while len(self._versions) > self._max_versions:
+                _, self._version_floor = self._versions.popitem(last=False)
+        self.local.delete(session_id)
+        if self.redis is not None:
+            try:
+                with self.redis.pipeline() as pipe:
+                    pipe.incr(self._version_key(session_id))
+                    pipe.expire(self._version_key(session_id), SESSION_CACHE_REDIS_TTL_SECONDS)
+                    pipe.delete(self._redis_key(session_id))
+                    pipe.execute()
+            except Exception as e:
+                logger.warning(f"Session cache invalidation failed: {e}")
+
+session_cache = SessionCache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL_SECONDS, REDIS_URL)
+
+def session_etag(data: dict, variant: str = "") -> str:
+    return f'"{data["session_id"]}-{data["updated_at"]}{variant}"'
@@ -1,12 +1,46 @@
 from sqlmodel import create_engine, SQLModel, Session
+from sqlalchemy.engine import make_url
+import itertools
 import os
+import threading
+import time
 from dotenv import load_dotenv
 import logging
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")  # Default to SQLite if not set
-engine = create_engine(DATABASE_URL, echo=True)
+# Optional comma-separated read replicas; read-only routes are spread across them
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+# Connection pool settings (ignored for SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Server-side statement timeout in milliseconds (Postgres only, 0 disables)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# After a session is written, its reads stay on the primary for this long
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+def engine_options(url: str) -> dict:
+    options = {"echo": True, "pool_pre_ping": DB_POOL_PRE_PING}
+    backend = make_url(url).get_backend_name()
+    if backend != "sqlite":
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    if backend == "postgresql" and DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+replica_engines = [create_engine(url, **engine_options(url)) for url in DATABASE_REPLICA_URLS]
+_replica_cycle = itertools.cycle(replica_engines)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -14,15 +48,54 @@ logger = logging.getLogger(__name__)
 
 # Log the loaded DATABASE_URL
 logger.info(f"Loaded DATABASE_URL: {DATABASE_URL}")
+if replica_engines:
+    logger.info(f"Routing reads across {len(replica_engines)} replica(s)")
 
 # Raise an error if DATABASE_URL is not set
 if not DATABASE_URL:
     logger.error("DATABASE_URL is not set. Please check your environment variables or .env file.")
     raise RuntimeError("DATABASE_URL is required but not set.")
 
+# Last write time per session id, for read-your-writes stickiness within this process
+_recent_writes = {}
+_recent_writes_lock = threading.Lock()
+
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    for replica in replica_engines:
+        # Real replicas receive the schema through replication; this only helps local stand-ins
+        try:
+            SQLModel.metadata.create_all(replica)
+        except Exception as e:
+            logger.warning(f"Could not create tables on replica {replica.url}: {e}")
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def mark_written(session_id: str):
+    """Record a write so the session's next reads are served by the primary."""
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[session_id] = now
+        # Drop expired entries so the map stays small
+        if len(_recent_writes) > 10000:
+            for key, written_at in list(_recent_writes.items()):
+                if now - written_at > READ_YOUR_WRITES_SECONDS:
+                    del _recent_writes[key]
+
+def recently_written(session_id: str) -> bool:
+    with _recent_writes_lock:
+        written_at = _recent_writes.get(session_id)
+    return written_at is not None and time.monotonic() - written_at < READ_YOUR_WRITES_SECONDS
+
+def get_read_session(session_id: str):
+    """Session for read-only routes: a replica unless this session was just written."""
+    if not replica_engines or recently_written(session_id):
+        bind = engine
+    else:
+        with _recent_writes_lock:
+            bind = next(_replica_cycle)
+    with Session(bind) as session:
+        session.info["replica"] = bind is not engine
+        yield session
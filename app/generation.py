@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import update
+from sqlmodel import Session
+from .agents import srs_agent
+from .budget import count_tokens, record_call_usage
+from .database import engine
+from .models import SRSGeneration
+from .profiling import span
+from .ratelimit import governor, is_provider_failure, ProviderUnavailable
+from .regeneration import SECTION_HEADING, SECTION_NUMBERS
+
+load_dotenv()
+
+# Streamed output is written to the checkpoint row once this much is new, or this often
+GENERATION_CHECKPOINT_CHARS = int(os.getenv("GENERATION_CHECKPOINT_CHARS", "2000"))
+GENERATION_CHECKPOINT_SECONDS = float(os.getenv("GENERATION_CHECKPOINT_SECONDS", "5"))
+
+# Output held back while waiting for the resumed section's heading
+RESUME_PREFACE_MAX_CHARS = 1000
+
+RESUME_INSTRUCTIONS = """
+
+THE BEGINNING OF THIS DOCUMENT HAS ALREADY BEEN WRITTEN:
+
+{partial}
+Continue the document starting with the heading "# {number}." and write only the remaining sections.
+Do not repeat anything that has already been written."""
+
+logger = logging.getLogger(__name__)
+
+def prompt_digest(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+def completed_prefix(text: str) -> Tuple[str, Optional[int]]:
+    """Cut a partial document back to its complete sections.
+
+    A section is complete once the next section's heading has been streamed. Returns the
+    text before the last heading and the number of the section to continue from, or
+    ("", None) when not even the first section is complete and generation starts over.
+    """
+    matches = list(SECTION_HEADING.finditer(text))
+    numbers = [int(m.group(1)) for m in matches]
+    if len(numbers) < 2 or numbers != SECTION_NUMBERS[:len(numbers)]:
+        return "", None
+    return text[:matches[-1].start()], numbers[-1]
+
+def completed_sections(text: str, complete: bool = False) -> List[int]:
+    numbers = [int(m.group(1)) for m in SECTION_HEADING.finditer(text)]
+    return numbers if complete else numbers[:-1]
+
+class Checkpoint:
+    """Streamed text of a generation, persisted to its SRSGeneration row as it grows."""
+
+    def __init__(self, session_id: str, text: str):
+        self.session_id = session_id
+        self.text = text
+        self.saved_length = len(text)
+        self.saved_at = time.monotonic()
+        self.heading = None
+        self.pending = ""
+
+    def resume_at(self, number: int):
+        """Hold back a continuation's output until the heading it was asked to start from."""
+        self.heading = re.compile(rf"^# {number}\.", re.MULTILINE)
+        self.pending = ""
+
+    def append(self, delta: str):
+        if self.heading is not None:
+            # Drop any preface the model writes before the heading (bounded, in case it never comes)
+            self.pending += delta
+            match = self.heading.search(self.pending)
+            if match is None and len(self.pending) < RESUME_PREFACE_MAX_CHARS:
+                return
+            delta = self.pending[match.start():] if match else self.pending
+            self.heading = None
+            self.pending = ""
+        self.text += delta
+        if (len(self.text) - self.saved_length >= GENERATION_CHECKPOINT_CHARS
+                or time.monotonic() - self.saved_at >= GENERATION_CHECKPOINT_SECONDS):
+            self.save()
+
+    def finish(self):
+        self.text += self.pending
+        self.heading = None
+        self.pending = ""
+        self.save(status="complete")
+
+    def save(self, **values):
+        with Session(engine) as db:
+            db.execute(
+                update(SRSGeneration)
+                .where(SRSGeneration.session_id == self.session_id)
+                .values(text=self.text, updated_at=datetime.utcnow(), **values)
+            )
+            db.commit()
+        self.saved_length = len(self.text)
+        self.saved_at = time.monotonic()
+
+def start_checkpoint(session_id: str, digest: str, stored_document: Optional[str] = None) -> SRSGeneration:
+    """Load the checkpoint for this prompt, or reset the session's checkpoint for a new one.
+
+    A complete checkpoint the session already stored (`stored_document`) is not reused:
+    asking again for the same prompt means asking for a new document.
+    """
+    with Session(engine) as db:
+        checkpoint = db.get(SRSGeneration, session_id)
+        if checkpoint is None:
+            checkpoint = SRSGeneration(session_id=session_id, prompt_digest=digest, updated_at=datetime.utcnow())
+        elif (checkpoint.prompt_digest != digest
+                or (checkpoint.status == "complete" and checkpoint.text == stored_document)):
+            checkpoint.prompt_digest = digest
+            checkpoint.text = ""
+            checkpoint.attempts = 0
+        if checkpoint.status != "complete" or checkpoint.text == "":
+            checkpoint.status = "running"
+            checkpoint.error = None
+        checkpoint.updated_at = datetime.utcnow()
+        db.add(checkpoint)
+        db.commit()
+        db.refresh(checkpoint)
+        return checkpoint
+
+async def run_generation(session_id: str, tenant_id: str, prompt: str, stored_document: Optional[str] = None) -> str:
+    """Stream the document, resuming from the last complete section after a failed attempt."""
+    stored = start_checkpoint(session_id, prompt_digest(prompt), stored_document)
+    if stored.status == "complete":
+        # Finished earlier but never stored on the session (e.g. the request went away)
+        return stored.text
+    checkpoint = Checkpoint(session_id, stored.text)
+    for attempt in range(governor.max_retries + 1):
+        partial, number = completed_prefix(checkpoint.text)
+        checkpoint.text = partial
+        call_prompt = prompt
+        if number is not None:
+            logger.info(f"Resuming generation for {session_id} from section {number}")
+            call_prompt += RESUME_INSTRUCTIONS.format(partial=partial, number=number)
+            checkpoint.resume_at(number)
+        checkpoint.save(attempts=SRSGeneration.attempts + 1)
+        prompt_tokens = count_tokens(call_prompt)
+        called = False
+        streamed = []
+        response_tokens = None
+        try:
+            async with governor.slot(prompt_tokens):
+                called = True
+                with span("agent:srs_agent"):
+                    async with srs_agent.run_stream(call_prompt) as result:
+                        async for delta in result.stream_text(delta=True, debounce_by=None):
+                            streamed.append(delta)
+                            checkpoint.append(delta)
+                        response_tokens = result.usage().response_tokens
+        except ProviderUnavailable as e:
+            checkpoint.save(status="failed", error=e.detail)
+            raise
+        except Exception as e:
+            if not is_provider_failure(e) or attempt == governor.max_retries:
+                checkpoint.save(status="failed", error=str(e))
+                raise
+            governor.stats["retried"] += 1
+            delay = governor.backoff(attempt)
+            logger.warning(f"Generation for {session_id} failed ({e}), resuming in {delay:.2f}s")
+            checkpoint.save()
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            checkpoint.save(status="interrupted")
+            raise
+        finally:
+            # Every provider call is charged, including failed and resumed attempts
+            if called:
+                record_call_usage(session_id, tenant_id, prompt_tokens, response_tokens or count_tokens("".join(streamed)))
+        checkpoint.finish()
+        return checkpoint.text
+
+# Running generations by (session id, prompt digest), shared by retried and reconnected requests
+_in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+def _generation_finished(key: Tuple[str, str], task: asyncio.Task):
+    _in_flight.pop(key, None)
+    if not task.cancelled():
+        # Mark the error as retrieved; it was already recorded on the checkpoint
+        task.exception()
+
+async def generate_document(session_id: str, tenant_id: str, prompt: str, stored_document: Optional[str] = None) -> str:
+    """Generate a full document with checkpointing.
+
+    The generation runs as its own task: a request that goes away does not lose it, and
+    a retry of the same prompt in this process joins it instead of starting another.
+    `stored_document` is the session's current document, which is never handed back as new.
+    """
+    key = (session_id, prompt_digest(prompt))
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(run_generation(session_id, tenant_id, prompt, stored_document))
+        _in_flight[key] = task
+        task.add_done_callback(lambda done: _generation_finished(key, done))
+    return await asyncio.shield(task)
@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .database import engine, create_db_and_tables
-from .routers import srs
+from .routers import srs, admin
+from .routers.admin import ADMIN_TOKEN
+from .profiling import PROFILING_ENABLED, ProfilingMiddleware
+from .responses import FastJSONResponse, CompressionMiddleware, COMPRESSION_MINIMUM_SIZE, GZIP_LEVEL
+from .writebehind import WRITE_BEHIND, write_behind
+from .retention import RETENTION_ENABLED, retention_loop
+import asyncio
 from dotenv import load_dotenv
 import os
 import logging
@@ -25,7 +31,7 @@ if not DATABASE_URL:
 
 
 
-app = FastAPI(title="SRS Generation API")
+app = FastAPI(title="SRS Generation API", default_response_class=FastJSONResponse)
 
 # CORS configuration
 app.add_middleware(
@@ -36,8 +42,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (brotli or gzip, negotiated from Accept-Encoding)
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE, compresslevel=GZIP_LEVEL)
+
+# Opt-in request profiling: "X-Profile: true" with a valid X-Admin-Token, or PROFILE_SAMPLE_RATE
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, admin_token=ADMIN_TOKEN)
+
 # Include routers
 app.include_router(srs.router)
+app.include_router(admin.router)
 
 # Create database tables on startup
 @app.on_event("startup")
@@ -49,6 +63,28 @@ def on_startup():
         logger.error(f"Error creating database tables: {e}")
         raise
 
+@app.on_event("startup")
+async def start_write_behind():
+    if WRITE_BEHIND:
+        write_behind.start()
+
+@app.on_event("startup")
+async def start_retention():
+    if RETENTION_ENABLED:
+        app.state.retention_task = asyncio.create_task(retention_loop())
+
+# Flush queued writes before the process exits
+@app.on_event("shutdown")
+async def stop_write_behind():
+    if WRITE_BEHIND:
+        await write_behind.stop()
+
+@app.on_event("shutdown")
+async def stop_retention():
+    task = getattr(app.state, "retention_task", None)
+    if task:
+        task.cancel()
+
 @app.get("/")
 def health_check():
     logger.info("Health check endpoint accessed.")
@@ -1,39 +1,8 @@
 from sqlmodel import Field, SQLModel, Relationship
 from typing import Optional, List
 from datetime import datetime
-from pydantic import BaseModel
-
-# SRS Input Model
-class SRSInput(BaseModel):
-    project_name: Optional[str] = Field(None, description="Project name")
-    srs_version: Optional[str] = Field(None, description="Version of the SRS document")
-    authors: Optional[str] = Field(None, description="Authors or contributors")
-    creation_date: Optional[str] = Field(None, description="Date of creation")
-    stakeholders: Optional[str] = Field(None, description="Stakeholders involved")
-    expected_release_date: Optional[str] = Field(None, description="Expected delivery or release date")
-    overview_summary: Optional[str] = Field(None, description="Brief summary of the system")
-    main_purpose: Optional[str] = Field(None, description="Main purpose of the project")
-    intended_users: Optional[str] = Field(None, description="Intended users or beneficiaries")
-    srs_purpose: Optional[str] = Field(None, description="Purpose of this SRS document")
-    scope: Optional[str] = Field(None, description="Scope of the software system")
-    assumptions: Optional[str] = Field(None, description="Assumptions, dependencies, or constraints")
-    acronyms: Optional[str] = Field(None, description="Acronyms, abbreviations, or references to explain")
-    problem: Optional[str] = Field(None, description="Problem or challenge addressed")
-    affected_parties: Optional[str] = Field(None, description="Who is affected and in what context")
-    impacts: Optional[str] = Field(None, description="Impacts or inefficiencies caused by current state")
-    resources: Optional[str] = Field(None, description="Resources and time allocated")
-    constraints: Optional[str] = Field(None, description="Budgetary or technical constraints")
-    mvp: Optional[str] = Field(None, description="Minimum viable solution")
-    ideal_solution: Optional[str] = Field(None, description="Ideal solution if no constraints")
-    deliverables: Optional[str] = Field(None, description="Expected deliverables of the system")
-    delivery_stages: Optional[str] = Field(None, description="Important delivery stages or milestones")
-    major_features: Optional[str] = Field(None, description="Major features or capabilities planned")
-    datasheets: Optional[str] = Field(None, description="Technical specifications or datasheets")
-    db_design: Optional[str] = Field(None, description="Main entities/tables and relationships")
-    uiux: Optional[str] = Field(None, description="UI/UX design details")
-    rabbit_holes: Optional[str] = Field(None, description="Feature ideas or areas for future exploration")
-    out_of_scope: Optional[str] = Field(None, description="Explicitly out of scope items")
-    restrictions: Optional[str] = Field(None, description="Technologies/methods/tools not to be used or legal/ethical restrictions")
+from pydantic import BaseModel, ConfigDict
+from .schema import SRSInput
 
 # Database Models
 class SRSSession(SQLModel, table=True):
@@ -72,16 +41,60 @@ class SRSSession(SQLModel, table=True):
     history: str = Field(default="")
     status: str = Field(default="active")
     latest_proposal: Optional[str] = Field(default=None)
+    section_cache: Optional[str] = Field(default=None)
+    dirty_fields: str = Field(default="")
+    tenant_id: str = Field(default="default", index=True)
+    prompt_tokens: int = Field(default=0)
+    completion_tokens: int = Field(default=0)
+
+# Regeneration bookkeeping, not part of the session representation served by the API
+SESSION_INTERNAL_FIELDS = {"section_cache", "dirty_fields"}
 
 class SRSMessage(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    session_id: str = Field(foreign_key="srssession.session_id")
+    session_id: str = Field(foreign_key="srssession.session_id", index=True)
     role: str
     content: str
     reasoning: Optional[str] = None
     sequence: int = Field(index=True)
     timestamp: datetime
 
+class SRSTranscript(SQLModel, table=True):
+    """Compact transcript: a session's messages packed into one append-only blob."""
+    session_id: str = Field(primary_key=True, foreign_key="srssession.session_id")
+    data: bytes = Field(default=b"")
+    message_count: int = Field(default=0)
+    projected_count: int = Field(default=0)
+    updated_at: datetime
+
+class SRSGeneration(SQLModel, table=True):
+    """Checkpointed output of the session's latest full-document generation."""
+    session_id: str = Field(primary_key=True, foreign_key="srssession.session_id")
+    prompt_digest: str
+    status: str = Field(default="running")
+    text: str = Field(default="")
+    attempts: int = Field(default=0)
+    error: Optional[str] = None
+    updated_at: datetime
+
+class TenantUsage(SQLModel, table=True):
+    """Tokens used by a tenant's sessions per UTC day."""
+    tenant_id: str = Field(primary_key=True)
+    day: str = Field(primary_key=True)
+    prompt_tokens: int = Field(default=0)
+    completion_tokens: int = Field(default=0)
+    calls: int = Field(default=0)
+
+class SRSArchive(SQLModel, table=True):
+    """Completed session moved out of the hot tables: session row and transcript as compressed JSON."""
+    session_id: str = Field(primary_key=True)
+    status: str
+    created_at: datetime
+    archived_at: datetime
+    original_bytes: int
+    compressed_bytes: int
+    data: bytes
+
 # Response Models
 class SRSStartResponse(BaseModel):
     session_id: str
@@ -100,5 +113,58 @@ class SRSGenerateRequest(BaseModel):
     style: Optional[str] = None
     tone: Optional[str] = None
 
+class SRSBatchGenerateRequest(BaseModel):
+    session_ids: List[str] = Field(..., min_length=1)
+    style: Optional[str] = None
+    tone: Optional[str] = None
+    concurrency: Optional[int] = Field(None, ge=1)
+
 class SRSCustomPromptRequest(BaseModel):
-    prompt: str
\ No newline at end of file
+    prompt: str
+
+class SRSFieldsUpdateRequest(SRSInput):
+    model_config = ConfigDict(extra="forbid")
+
+class SRSGenerationResponse(BaseModel):
+    session_id: str
+    status: str
+    completed_sections: List[int]
+    attempts: int
+    error: Optional[str] = None
+    updated_at: datetime
+    srs: str
+
+class SRSUsageResponse(BaseModel):
+    session_id: str
+    tenant_id: str
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    budget: Optional[int] = None
+    remaining: Optional[int] = None
+
+class SRSSimilarSession(BaseModel):
+    session_id: str
+    project_name: str
+    overview_summary: str
+    score: float
+    has_document: bool
+
+class SRSSimilarResponse(BaseModel):
+    session_id: str
+    matched_on: str
+    matches: List[SRSSimilarSession]
+
+class SRSPrefillRequest(BaseModel):
+    source_session_id: str
+
+class SRSPrefillResponse(BaseModel):
+    session_id: str
+    source_session_id: str
+    prefilled_fields: List[str]
+    srs: Optional[str] = None
+
+class SRSFieldsUpdateResponse(BaseModel):
+    session_id: str
+    updated_fields: List[str]
+    dirty_fields: List[str]
\ No newline at end of file
@@ -0,0 +1,236 @@
+import asyncio
+import contextvars
+import functools
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders
+
+load_dotenv()
+
+# Per-request profiling for production triage; nothing is installed unless enabled
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+PROFILE_MAX_DEPTH = 64
+
+_current_profile = contextvars.ContextVar("current_profile", default=None)
+
+class Profile:
+    """Span timings and stack samples collected for a single request."""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.spans = []
+        self.samples = Counter()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task: Optional[asyncio.Task] = None
+        # Worker threads currently running this request's sync code
+        self._threads = Counter()
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def add_span(self, name: str, started: float, ended: float):
+        self.spans.append({
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 3),
+            "duration_ms": round((ended - started) * 1000, 3),
+        })
+
+    @contextmanager
+    def thread(self):
+        """Sample the calling thread while the block runs (a sync endpoint in the threadpool)."""
+        thread_id = threading.get_ident()
+        with self._threads_lock:
+            self._threads[thread_id] += 1
+        try:
+            yield
+        finally:
+            with self._threads_lock:
+                self._threads[thread_id] -= 1
+                if not self._threads[thread_id]:
+                    del self._threads[thread_id]
+
+    def _record(self, frame):
+        stack = []
+        while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        if stack:
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _sample(self, loop_thread_id: int):
+        """Sample only this request's code; awaited time shows up in spans instead.
+
+        The event-loop thread is sampled while it runs the request's task (not other
+        requests' tasks, not the idle loop), plus the worker threads registered by `thread`.
+        """
+        interval = PROFILE_INTERVAL_MS / 1000
+        while not self._stop.wait(interval):
+            running = asyncio.current_task(self.loop) is self.task
+            frames = sys._current_frames()
+            if running and asyncio.current_task(self.loop) is self.task:
+                self._record(frames.get(loop_thread_id))
+            with self._threads_lock:
+                thread_ids = list(self._threads)
+            for thread_id in thread_ids:
+                self._record(frames.get(thread_id))
+
+    def start(self):
+        """Start sampling; called from the task that handles the request."""
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        threading.Thread(target=self._sample, args=(threading.get_ident(),), daemon=True).start()
+
+    def stop(self, status_code: Optional[int] = None):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.status_code = status_code
+        self.duration_ms = round((time.perf_counter() - self.started) * 1000, 3)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            **self.summary(),
+            "sample_interval_ms": PROFILE_INTERVAL_MS,
+            "spans": self.spans,
+            "samples": sum(self.samples.values()),
+        }
+
+    def collapsed(self) -> str:
+        """Stack samples in collapsed format (flamegraph.pl, speedscope), plus spans weighted by ms."""
+        lines = [f"{stack} {count}" for stack, count in self.samples.most_common()]
+        lines += [f"span;{span['name']} {max(1, round(span['duration_ms']))}" for span in self.spans]
+        return "\n".join(lines) + "\n"
+
+# Bounded ring buffer of finished profiles
+profiles = deque(maxlen=PROFILE_BUFFER_SIZE)
+
+def should_profile(requested: bool) -> bool:
+    return requested or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+
+@contextmanager
+def profile_request(method: str, path: str):
+    profile = Profile(method, path)
+    token = _current_profile.set(profile)
+    profile.start()
+    try:
+        yield profile
+    finally:
+        # Also ends the sampler when the request raised before a status was recorded
+        profile.stop()
+        _current_profile.reset(token)
+        profiles.append(profile)
+
+class ProfilingMiddleware:
+    """Profiles requests sent with "X-Profile: true" and a valid admin token, or sampled.
+
+    Pure ASGI rather than `@app.middleware("http")`, which would run the endpoint in a
+    separate task: here the endpoint runs in the task the profile samples.
+    """
+
+    def __init__(self, app, admin_token: Optional[str]):
+        self.app = app
+        self.admin_token = admin_token
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        requested = (
+            headers.get("x-profile", "").lower() == "true"
+            and self.admin_token is not None
+            and headers.get("x-admin-token") == self.admin_token
+        )
+        if not should_profile(requested):
+            await self.app(scope, receive, send)
+            return
+        status = {}
+        with profile_request(scope["method"], scope["path"]) as profile:
+            async def send_with_profile_id(message):
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+                    MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+                await send(message)
+
+            await self.app(scope, receive, send_with_profile_id)
+            profile.stop(status.get("code"))
+
+def profiled_endpoint(endpoint):
+    """Register the worker thread of a sync endpoint with the request's profile."""
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        with profile.thread():
+            return endpoint(*args, **kwargs)
+    return wrapper
+
+class ProfiledRoute(APIRoute):
+    """Route whose sync endpoint is sampled on the threadpool thread that runs it."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if PROFILING_ENABLED and not asyncio.iscoroutinefunction(endpoint):
+            endpoint = profiled_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+def get_profile(profile_id: str) -> Optional[Profile]:
+    return next((profile for profile in profiles if profile.id == profile_id), None)
+
+@contextmanager
+def span(name: str):
+    """Time a block when the current request is being profiled; a no-op otherwise."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, started, time.perf_counter())
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    starts = conn.info.get("profile_query_start")
+    if profile is not None and starts:
+        profile.add_span(f"sql:{statement.split(None, 1)[0].upper()}", starts.pop(), time.perf_counter())
+
+if PROFILING_ENABLED:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+import groq
+import httpx
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from .budget import count_tokens
+from .profiling import span
+
+load_dotenv()
+
+# Batch generation limits
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+BATCH_RATE_PER_SECOND = float(os.getenv("BATCH_RATE_PER_SECOND", "2"))
+BATCH_BURST = float(os.getenv("BATCH_BURST", "4"))
+
+# Provider governor limits, shared by every agent call
+PROVIDER_REQUESTS_PER_SECOND = float(os.getenv("PROVIDER_REQUESTS_PER_SECOND", "5"))
+PROVIDER_REQUEST_BURST = float(os.getenv("PROVIDER_REQUEST_BURST", "10"))
+PROVIDER_TOKENS_PER_MINUTE = float(os.getenv("PROVIDER_TOKENS_PER_MINUTE", "200000"))
+PROVIDER_MIN_CONCURRENCY = int(os.getenv("PROVIDER_MIN_CONCURRENCY", "1"))
+PROVIDER_MAX_CONCURRENCY = int(os.getenv("PROVIDER_MAX_CONCURRENCY", "16"))
+PROVIDER_LATENCY_TARGET_SECONDS = float(os.getenv("PROVIDER_LATENCY_TARGET_SECONDS", "30"))
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "3"))
+PROVIDER_BACKOFF_BASE_SECONDS = float(os.getenv("PROVIDER_BACKOFF_BASE_SECONDS", "0.5"))
+PROVIDER_BACKOFF_MAX_SECONDS = float(os.getenv("PROVIDER_BACKOFF_MAX_SECONDS", "20"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Asyncio token bucket: `rate` tokens are added per second, up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until `amount` tokens are available and take them."""
+        # Requests larger than the bucket would never fit; let them drain it instead
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+# Shared by all batch requests so concurrent batches respect one upstream budget
+batch_bucket = TokenBucket(BATCH_RATE_PER_SECOND, BATCH_BURST)
+
+class ProviderUnavailable(HTTPException):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail="Model provider is unavailable, please retry later",
+            headers={"Retry-After": str(max(1, int(retry_after)))},
+        )
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit: grows by ~1 per window of fast calls, shrinks on throttling or slow calls."""
+
+    def __init__(self, min_limit: int, max_limit: int, latency_target: float, decrease_factor: float = 0.7):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.limit = float(max(min_limit, min(max_limit, max_limit // 2 or 1)))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < max(1, int(self.limit)))
+            self.in_flight += 1
+
+    async def release(self, started: float, throttled: bool = False):
+        async with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled or now - started > self.latency_target:
+                # Calls already in flight at the last decrease report the same congestion: shrink once per window
+                if started >= self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+class CircuitBreaker:
+    """Opens after consecutive provider failures; lets one probe through after `reset_timeout`."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if self.retry_after() > 0:
+                return False
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open":
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def release_probe(self):
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(f"Circuit breaker opened after {self.failures} provider failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+def is_throttled(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+def is_provider_failure(error: Exception) -> bool:
+    """Errors that say the provider is overloaded or unreachable, as opposed to a bad request or output."""
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code == 429 or status_code >= 500
+    # The Groq SDK raises its own connection/timeout errors, which pydantic-ai passes through unwrapped
+    return isinstance(error, (groq.APIConnectionError, httpx.TransportError, asyncio.TimeoutError))
+
+class ProviderGovernor:
+    """Client-side admission control around model provider calls.
+
+    Every call waits for the request and token buckets and a slot in the adaptive
+    concurrency limit, and is rejected immediately while the circuit breaker is open.
+    `run` adds jittered exponential backoff for throttling and transient failures.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = PROVIDER_REQUESTS_PER_SECOND,
+        request_burst: float = PROVIDER_REQUEST_BURST,
+        tokens_per_minute: float = PROVIDER_TOKENS_PER_MINUTE,
+        min_concurrency: int = PROVIDER_MIN_CONCURRENCY,
+        max_concurrency: int = PROVIDER_MAX_CONCURRENCY,
+        latency_target: float = PROVIDER_LATENCY_TARGET_SECONDS,
+        max_retries: int = PROVIDER_MAX_RETRIES,
+        backoff_base: float = PROVIDER_BACKOFF_BASE_SECONDS,
+        backoff_max: float = PROVIDER_BACKOFF_MAX_SECONDS,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_SECONDS,
+    ):
+        self.request_bucket = TokenBucket(requests_per_second, request_burst)
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(min_concurrency, max_concurrency, latency_target)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = {"calls": 0, "succeeded": 0, "failed": 0, "throttled": 0, "retried": 0, "rejected": 0}
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 1):
+        """Admit a single provider call and record its outcome."""
+        if not self.breaker.allow():
+            self.stats["rejected"] += 1
+            raise ProviderUnavailable(self.breaker.retry_after())
+        try:
+            await self.request_bucket.acquire()
+            await self.token_bucket.acquire(tokens)
+            await self.concurrency.acquire()
+        except BaseException:
+            # Cancelled while waiting for admission: a half-open probe must not stay taken
+            self.breaker.release_probe()
+            raise
+        self.stats["calls"] += 1
+        started = time.monotonic()
+        throttled = False
+        try:
+            yield
+        except Exception as e:
+            if is_provider_failure(e):
+                throttled = is_throttled(e)
+                self.stats["throttled" if throttled else "failed"] += 1
+                self.breaker.record_failure()
+            else:
+                # The provider answered; the failure is ours (bad output, validation, ...)
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            # Cancelled before the provider answered: free a half-open probe without judging it
+            self.breaker.release_probe()
+            raise
+        else:
+            self.stats["succeeded"] += 1
+            self.breaker.record_success()
+        finally:
+            await self.concurrency.release(started, throttled)
+
+    async def run(self, agent, prompt: str, tokens: Optional[int] = None, **kwargs):
+        """Run `agent.run(prompt)` under the governor, retrying throttled and transient failures.
+
+        Pass `tokens` when the prompt has already been counted.
+        """
+        if tokens is None:
+            tokens = count_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.slot(tokens):
+                    with span(f"agent:{getattr(agent, 'name', None) or 'agent'}"):
+                        return await agent.run(prompt, **kwargs)
+            except ProviderUnavailable:
+                raise
+            except Exception as e:
+                if not is_provider_failure(e) or attempt == self.max_retries:
+                    raise
+                self.stats["retried"] += 1
+                delay = self.backoff(attempt)
+                logger.warning(f"Provider call failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def snapshot(self) -> dict:
+        """Current governor state for monitoring."""
+        self.request_bucket._refill()
+        self.token_bucket._refill()
+        return {
+            "breaker": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.failures,
+                "retry_after": round(self.breaker.retry_after(), 2) if self.breaker.state == "open" else 0,
+            },
+            "concurrency": {
+                "limit": round(self.concurrency.limit, 2),
+                "in_flight": self.concurrency.in_flight,
+            },
+            "request_tokens_available": round(self.request_bucket.tokens, 2),
+            "prompt_tokens_available": round(self.token_bucket.tokens, 2),
+            "stats": dict(self.stats),
+        }
+
+governor = ProviderGovernor()
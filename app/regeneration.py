@@ -0,0 +1,89 @@
+import hashlib
+import json
+import re
+from typing import Dict, Iterable, List, Optional
+from .agents import SRS_PROMPT_FOOTER, SRS_PROMPT_HEADER, SRS_SECTION_PROMPT_HEADER, SRS_SECTIONS
+from .schema import SRSInput, input_values
+
+# Top-level numbered headings ("# 3. DEFINITIONS & REFERENCE") delimit the generated sections
+SECTION_HEADING = re.compile(r"^# (\d+)\.", re.MULTILINE)
+SECTION_NUMBERS = [number for number, _, _, _ in SRS_SECTIONS]
+
+# Changes to the shared prompt text invalidate every cached section
+PROMPT_TEXT = [SRS_PROMPT_HEADER, SRS_SECTION_PROMPT_HEADER, SRS_PROMPT_FOOTER]
+
+def section_digests(data: SRSInput, extra: str = "") -> Dict[int, str]:
+    """Fingerprint the inputs of every section.
+
+    Covers the section's template and the shared prompt text as well as the style/tone
+    instructions and field values, so a prompt change also regenerates the section.
+    """
+    values = input_values(data)
+    digests = {}
+    for number, _, fields, template in SRS_SECTIONS:
+        payload = json.dumps(PROMPT_TEXT + [template, extra] + [values[field] for field in fields])
+        digests[number] = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return digests
+
+def split_sections(document: str) -> Optional[Dict[str, object]]:
+    """Split a generated document into its preamble and numbered sections.
+
+    Returns None when the document does not contain every section exactly once and
+    in order, in which case it cannot be regenerated incrementally.
+    """
+    matches = list(SECTION_HEADING.finditer(document))
+    if [int(m.group(1)) for m in matches] != SECTION_NUMBERS:
+        return None
+    bounds = [m.start() for m in matches] + [len(document)]
+    return {
+        "preamble": document[:bounds[0]],
+        "sections": {
+            number: document[start:end]
+            for number, start, end in zip(SECTION_NUMBERS, bounds, bounds[1:])
+        },
+    }
+
+def build_section_cache(document: str, digests: Dict[int, str]) -> Optional[str]:
+    """Serialize the per-section text and input digests stored on the session."""
+    parts = split_sections(document)
+    if parts is None:
+        return None
+    return json.dumps({
+        "preamble": parts["preamble"],
+        "sections": {
+            str(number): {"digest": digests[number], "text": text}
+            for number, text in parts["sections"].items()
+        },
+    })
+
+def load_section_cache(raw: Optional[str]) -> Optional[dict]:
+    if not raw:
+        return None
+    try:
+        cache = json.loads(raw)
+    except ValueError:
+        return None
+    if set(cache.get("sections", {})) != {str(number) for number in SECTION_NUMBERS}:
+        return None
+    return cache
+
+def stale_sections(cache: dict, digests: Dict[int, str], dirty_fields: Iterable[str] = ()) -> List[int]:
+    """Return the sections whose inputs changed or were edited since the cached document was generated."""
+    dirty = set(dirty_fields)
+    return [
+        number for number, _, fields, _ in SRS_SECTIONS
+        if cache["sections"][str(number)]["digest"] != digests[number] or dirty.intersection(fields)
+    ]
+
+def parse_dirty_fields(raw: str) -> List[str]:
+    return [field for field in raw.split(",") if field]
+
+def assemble_document(cache: dict, rewritten: Dict[int, str]) -> str:
+    """Rebuild the document from cached sections, replacing the rewritten ones."""
+    parts = [cache["preamble"]]
+    for number in SECTION_NUMBERS:
+        if number in rewritten:
+            parts.append(rewritten[number].strip() + "\n\n")
+        else:
+            parts.append(cache["sections"][str(number)]["text"])
+    return "".join(parts)
@@ -0,0 +1,88 @@
+import os
+from dotenv import load_dotenv
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from .profiling import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+load_dotenv()
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: orjson when installed, and a serialization span on profiled requests."""
+
+    def render(self, content) -> bytes:
+        with span("serialize"):
+            if orjson is not None:
+                return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+            return super().render(content)
+
+class MarkdownResponse(Response):
+    media_type = "text/markdown; charset=utf-8"
+
+def wants_markdown(request: Request) -> bool:
+    """Raw markdown is requested with ?format=markdown or an Accept header preferring text/markdown."""
+    if request.query_params.get("format") == "markdown":
+        return True
+    return request.headers.get("accept", "").split(",")[0].strip().startswith("text/markdown")
+
+def srs_response(request: Request, document: str, headers: dict = None) -> Response:
+    if wants_markdown(request):
+        return MarkdownResponse(content=document, headers=headers)
+    return FastJSONResponse(content={"srs": document}, headers=headers)
+
+class FlushingGZipResponder(GZipResponder):
+    """Gzip that sync-flushes each streamed chunk so NDJSON lines are not held back."""
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        self.gzip_file.write(body)
+        if more_body:
+            self.gzip_file.flush()
+        else:
+            self.gzip_file.close()
+        body = self.gzip_buffer.getvalue()
+        self.gzip_buffer.seek(0)
+        self.gzip_buffer.truncate()
+        return body
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        return data + (self.compressor.flush() if more_body else self.compressor.finish())
+
+class CompressionMiddleware(GZipMiddleware):
+    """Negotiates brotli (when installed) or gzip for responses above the size threshold."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":  # pragma: no cover
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        if brotli is not None and "br" in accept_encoding:
+            responder = BrotliResponder(self.app, self.minimum_size, BROTLI_QUALITY)
+        elif "gzip" in accept_encoding:
+            responder = FlushingGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
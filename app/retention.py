@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import List
+from dotenv import load_dotenv
+from sqlalchemy import delete, exists
+from sqlmodel import Session, select
+from .cache import session_cache
+from .database import engine
+from .models import SRSArchive, SRSGeneration, SRSMessage, SRSSession, SRSTranscript
+from .transcript import unpack_messages
+
+load_dotenv()
+
+# Session lifecycle: expire abandoned interviews, archive completed sessions
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "false").lower() == "true"
+SESSION_TTL_HOURS = float(os.getenv("SESSION_TTL_HOURS", "72"))
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "100"))
+RETENTION_BATCH_PAUSE_SECONDS = float(os.getenv("RETENTION_BATCH_PAUSE_SECONDS", "0.5"))
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+
+logger = logging.getLogger(__name__)
+
+metrics = {
+    "runs": 0,
+    "expired_sessions": 0,
+    "archived_sessions": 0,
+    "deleted_messages": 0,
+    "reclaimed_bytes": 0,
+    "archive_bytes": 0,
+    "last_run_at": None,
+    "last_run_seconds": None,
+}
+
+def expired_filter(cutoff: datetime):
+    """Active sessions with no session, message or transcript activity since `cutoff`."""
+    return (
+        SRSSession.status == "active",
+        SRSSession.updated_at < cutoff,
+        ~exists().where(SRSMessage.session_id == SRSSession.session_id, SRSMessage.timestamp >= cutoff),
+        ~exists().where(SRSTranscript.session_id == SRSSession.session_id, SRSTranscript.updated_at >= cutoff),
+    )
+
+def archivable_filter(cutoff: datetime):
+    return (SRSSession.status == "complete", SRSSession.updated_at < cutoff)
+
+def session_payload(db: Session, session: SRSSession) -> bytes:
+    """Serialize a session with its transcript, from whichever storage holds it.
+
+    A compact transcript is authoritative: its SRSMessage projection may lag behind it.
+    """
+    transcript = db.get(SRSTranscript, session.session_id)
+    if transcript is not None:
+        messages = unpack_messages(session.session_id, transcript.data)
+    else:
+        messages = db.exec(
+            select(SRSMessage).where(SRSMessage.session_id == session.session_id).order_by(SRSMessage.sequence)
+        ).all()
+    return json.dumps({
+        "session": session.model_dump(mode="json"),
+        "messages": [message.model_dump(mode="json", exclude={"id"}) for message in messages],
+    }).encode("utf-8")
+
+def process_batch(filters, archive: bool) -> int:
+    """Remove (and optionally archive) one bounded batch of sessions in its own short transaction."""
+    with Session(engine) as db:
+        # SKIP LOCKED keeps the sweep from waiting on sessions that live requests are writing
+        sessions = db.exec(
+            select(SRSSession).where(*filters).limit(RETENTION_BATCH_SIZE).with_for_update(skip_locked=True)
+        ).all()
+        if not sessions:
+            return 0
+        session_ids: List[str] = [session.session_id for session in sessions]
+        now = datetime.utcnow()
+        reclaimed = 0
+        for session in sessions:
+            payload = session_payload(db, session)
+            reclaimed += len(payload)
+            if archive:
+                data = zlib.compress(payload, 9)
+                metrics["archive_bytes"] += len(data)
+                db.add(SRSArchive(
+                    session_id=session.session_id,
+                    status=session.status,
+                    created_at=session.created_at,
+                    archived_at=now,
+                    original_bytes=len(payload),
+                    compressed_bytes=len(data),
+                    data=data,
+                ))
+        deleted = db.execute(delete(SRSMessage).where(SRSMessage.session_id.in_(session_ids)))
+        db.execute(delete(SRSTranscript).where(SRSTranscript.session_id.in_(session_ids)))
+        db.execute(delete(SRSGeneration).where(SRSGeneration.session_id.in_(session_ids)))
+        db.execute(delete(SRSSession).where(SRSSession.session_id.in_(session_ids)))
+        db.commit()
+    for session_id in session_ids:
+        session_cache.invalidate(session_id)
+    metrics["deleted_messages"] += deleted.rowcount
+    metrics["reclaimed_bytes"] += reclaimed
+    metrics["archived_sessions" if archive else "expired_sessions"] += len(session_ids)
+    return len(session_ids)
+
+def sweep(filters, archive: bool, max_batches: int) -> int:
+    total = 0
+    for _ in range(max_batches):
+        count = process_batch(filters, archive)
+        total += count
+        if count < RETENTION_BATCH_SIZE:
+            break
+        time.sleep(RETENTION_BATCH_PAUSE_SECONDS)
+    return total
+
+def run_retention(max_batches: int = 1000) -> dict:
+    """Expire abandoned sessions and archive old completed ones; returns this run's counts."""
+    started = time.monotonic()
+    now = datetime.utcnow()
+    expired = sweep(expired_filter(now - timedelta(hours=SESSION_TTL_HOURS)), False, max_batches)
+    archived = sweep(archivable_filter(now - timedelta(days=ARCHIVE_AFTER_DAYS)), True, max_batches)
+    metrics["runs"] += 1
+    metrics["last_run_at"] = now.isoformat()
+    metrics["last_run_seconds"] = round(time.monotonic() - started, 3)
+    logger.info(f"Retention run expired {expired} and archived {archived} sessions")
+    return {"expired_sessions": expired, "archived_sessions": archived}
+
+async def retention_loop():
+    while True:
+        try:
+            await asyncio.to_thread(run_retention)
+        except Exception as e:
+            logger.error(f"Retention run failed: {e}")
+        await asyncio.sleep(RETENTION_INTERVAL_SECONDS)
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+import asyncio
+import os
+from dotenv import load_dotenv
+from sqlmodel import Session
+from ..budget import tenant_usage
+from ..database import get_session
+from ..ratelimit import governor
+from ..writebehind import write_behind
+from .. import retention
+from .. import profiling
+
+load_dotenv()
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)], route_class=profiling.ProfiledRoute)
+
+@router.get("/governor")
+def get_governor_state():
+    return governor.snapshot()
+
+@router.get("/write-behind")
+def get_write_behind_state():
+    return write_behind.snapshot()
+
+@router.get("/retention")
+def get_retention_metrics():
+    return {
+        "enabled": retention.RETENTION_ENABLED,
+        "session_ttl_hours": retention.SESSION_TTL_HOURS,
+        "archive_after_days": retention.ARCHIVE_AFTER_DAYS,
+        "batch_size": retention.RETENTION_BATCH_SIZE,
+        "metrics": retention.metrics,
+    }
+
+@router.post("/retention/run")
+async def run_retention_now():
+    try:
+        return await asyncio.to_thread(retention.run_retention)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running retention: {str(e)}")
+
+@router.get("/profiles")
+def list_profiles():
+    return [profile.summary() for profile in reversed(profiling.profiles)]
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.to_dict()
+
+@router.get("/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+def get_profile_collapsed(profile_id: str):
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.collapsed()
+
+@router.get("/tenants/{tenant_id}/usage")
+def get_tenant_usage(tenant_id: str, days: int = Query(7, ge=1, le=366), db: Session = Depends(get_session)):
+    return tenant_usage(db, tenant_id, days)
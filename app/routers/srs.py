@@ -1,76 +1,145 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlmodel import Session, select
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, update
+from typing import List, Optional
+import asyncio
+import json
 import uuid
 from datetime import datetime
-from ..database import get_session
+from ..database import engine, get_session, get_read_session, mark_written
 from ..models import (
-    SRSSession, SRSMessage, SRSInput,
+    SRSSession, SRSMessage, SRSGeneration, SESSION_INTERNAL_FIELDS,
     SRSStartResponse, SRSContinueRequest, 
     SRSContinueResponse, SRSGenerateRequest,
-    SRSCustomPromptRequest
+    SRSCustomPromptRequest, SRSFieldsUpdateRequest,
+    SRSFieldsUpdateResponse, SRSBatchGenerateRequest,
+    SRSGenerationResponse, SRSUsageResponse, SRSSimilarResponse,
+    SRSPrefillRequest, SRSPrefillResponse
 )
+from ..schema import session_to_input, session_values, apply_to_session, column_values
 from ..agents import (
     srs_chat_agent, srs_structured_agent,
-    srs_agent, SRS_BASE_PROMPT, format_srs_prompt, validate_response
+    srs_agent, SRS_BASE_PROMPT, format_srs_prompt, format_srs_section_prompt,
+    validate_response
 )
+from ..budget import (
+    count_tokens, admit, record_usage, completion_tokens,
+    history_limit, trim_history, session_usage
+)
+from ..cache import session_cache, session_etag
+from ..profiling import span, ProfiledRoute
+from ..similarity import similarity_index, SIMILAR_SESSIONS_ENABLED
+from ..responses import FastJSONResponse, srs_response, wants_markdown
+from ..ratelimit import batch_bucket, governor, BATCH_MAX_CONCURRENCY
+from ..transcript import load_messages, append_messages, schedule_projection
+from ..generation import generate_document, completed_sections
+from ..regeneration import (
+    section_digests, build_section_cache, load_section_cache,
+    stale_sections, assemble_document, parse_dirty_fields
+)
+
+router = APIRouter(prefix="/srs", tags=["SRS"], route_class=ProfiledRoute)
 
-router = APIRouter(prefix="/srs", tags=["SRS"])
+def session_written(session_id: str):
+    """Call after committing a session write: drop cached reads and pin reads to the primary."""
+    mark_written(session_id)
+    session_cache.invalidate(session_id)
 
 @router.post("/start", response_model=SRSStartResponse)
-async def start_srs_session(db: Session = Depends(get_session)):
+async def start_srs_session(
+    background_tasks: BackgroundTasks,
+    x_tenant_id: Optional[str] = Header(None),
+    db: Session = Depends(get_session)
+):
     session_id = str(uuid.uuid4())
     now = datetime.utcnow()
     session = SRSSession(session_id=session_id, created_at=now, updated_at=now)
+    if x_tenant_id:
+        session.tenant_id = x_tenant_id
     db.add(session)
     db.commit()  # Commit the session to ensure the session_id exists in the database
+    mark_written(session_id)
     try:
-        ai_response = await srs_chat_agent.run(SRS_BASE_PROMPT.strip())
+        prompt = SRS_BASE_PROMPT.strip()
+        prompt_tokens = count_tokens(prompt)
+        admit(db, session, prompt_tokens)
+        ai_response = await governor.run(srs_chat_agent, prompt, tokens=prompt_tokens)
         if not ai_response or not hasattr(ai_response, "output"):
             raise HTTPException(status_code=500, detail="Failed to get initial AI response")
-        db.add(SRSMessage(
+        record_usage(db, session, prompt_tokens, completion_tokens(ai_response))
+        append_messages(db, session_id, [SRSMessage(
             session_id=session_id,
             role="assistant",
             content=ai_response.output.question,
             reasoning=ai_response.output.reason,
             sequence=1,
             timestamp=now
-        ))
+        )])
         db.commit()
+        schedule_projection(background_tasks, session_id)
         return SRSStartResponse(
             session_id=session_id,
             question=ai_response.output.question,
             reason=ai_response.output.reason
         )
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error starting session: {str(e)}")
 
+def interview_turns(messages: List[SRSMessage]) -> List[str]:
+    return [
+        f"{'Assistant' if msg.role == 'assistant' else 'User'}: {msg.content}\n"
+        for msg in messages
+    ]
+
+def is_final_question(message: SRSMessage) -> bool:
+    return message.role == "assistant" and "all done" in message.content.lower()
+
 @router.post("/{session_id}/continue", response_model=SRSContinueResponse)
-async def continue_srs(session_id: str, request: SRSContinueRequest, db: Session = Depends(get_session)):
+async def continue_srs(
+    session_id: str,
+    request: SRSContinueRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_session)
+):
     session = db.get(SRSSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     try:
-        messages = db.exec(
-            select(SRSMessage).where(SRSMessage.session_id == session_id).order_by(SRSMessage.sequence)
-        ).all()
+        messages = load_messages(db, session_id)
+        header = SRS_BASE_PROMPT.strip() + "\n\n"
+        if session.status == "active" and messages and is_final_question(messages[-1]):
+            # The interview already ended but its answers were not extracted (e.g. the budget
+            # ran out): retry the extraction without calling the chat agent again
+            await finalize_srs(session, db, header + "".join(interview_turns(messages)))
+            db.commit()
+            session_written(session_id)
+            similarity_index.mark_stale()
+            return SRSContinueResponse(question=messages[-1].content, reason=messages[-1].reasoning or "", is_complete=True)
         
         # Build conversation history
-        history = SRS_BASE_PROMPT.strip() + "\n\n"
-        for msg in messages:
-            role = "Assistant" if msg.role == "assistant" else "User"
-            history += f"{role}: {msg.content}\n"
-        history += f"User: {request.response}\n"
+        with span("build_prompt"):
+            turns = interview_turns(messages)
+            turns.append(f"User: {request.response}\n")
+            history = header + "".join(turns)
+            # The chat agent only needs recent turns: drop the oldest ones to stay within the limits
+            chat_prompt = trim_history(header, turns, history_limit(db, session)) or header + turns[-1]
+            prompt_tokens = count_tokens(chat_prompt)
+        admit(db, session, prompt_tokens)
         
         # Get and validate AI response
-        raw_response = await srs_chat_agent.run(history)
+        raw_response = await governor.run(srs_chat_agent, chat_prompt, tokens=prompt_tokens)
         if not raw_response:
             raise HTTPException(status_code=500, detail="Empty AI response")
+        record_usage(db, session, prompt_tokens, completion_tokens(raw_response))
             
         try:
-            ai_response = validate_response(raw_response.output)
+            with span("validate_response"):
+                ai_response = validate_response(raw_response.output)
         except Exception as e:
             raise HTTPException(
                 status_code=422,
@@ -82,27 +151,36 @@ async def continue_srs(session_id: str, request: SRSContinueRequest, db: Session
         
         # Save user and assistant messages to the database
         next_sequence = len(messages) + 1
-        db.add(SRSMessage(
-            session_id=session_id,
-            role="user",
-            content=request.response,
-            sequence=next_sequence,
-            timestamp=datetime.utcnow()
-        ))
-        db.add(SRSMessage(
-            session_id=session_id,
-            role="assistant",
-            content=ai_response.question,
-            reasoning=ai_response.reason,
-            sequence=next_sequence + 1,
-            timestamp=datetime.utcnow()
-        ))
+        append_messages(db, session_id, [
+            SRSMessage(
+                session_id=session_id,
+                role="user",
+                content=request.response,
+                sequence=next_sequence,
+                timestamp=datetime.utcnow()
+            ),
+            SRSMessage(
+                session_id=session_id,
+                role="assistant",
+                content=ai_response.question,
+                reasoning=ai_response.reason,
+                sequence=next_sequence + 1,
+                timestamp=datetime.utcnow()
+            ),
+        ])
         
         # Finalize session if complete
         if is_complete:
+            # Keep the final turn and charge the chat call even if extraction is rejected below
+            db.commit()
+            session_written(session_id)
             await finalize_srs(session, db, history)
         
         db.commit()
+        session_written(session_id)
+        schedule_projection(background_tasks, session_id)
+        if is_complete:
+            similarity_index.mark_stale()
         return SRSContinueResponse(
             question=ai_response.question,
             reason=ai_response.reason,
@@ -120,70 +198,347 @@ async def continue_srs(session_id: str, request: SRSContinueRequest, db: Session
 
 async def finalize_srs(session: SRSSession, db: Session, history: str):
     try:
-        structured_result = await srs_structured_agent.run(history)
+        # Extraction needs every answer, so the full history is never trimmed
+        prompt_tokens = count_tokens(history)
+        admit(db, session, prompt_tokens)
+        structured_result = await governor.run(srs_structured_agent, history, tokens=prompt_tokens)
         if not structured_result or not hasattr(structured_result, "output"):
             raise Exception("Failed to generate structured SRS data")
-        srs_data = structured_result.output.dict()
-        for field in SRSInput.__fields__:
-            if field in srs_data:
-                setattr(session, field, srs_data[field])
+        record_usage(db, session, prompt_tokens, completion_tokens(structured_result))
+        # Prefilled answers the interview did not come back to are kept
+        apply_to_session(session, structured_result.output, keep_filled=True)
         session.status = "complete"
         session.updated_at = datetime.utcnow()
         db.add(session)
+    except HTTPException:
+        raise
     except Exception as e:
         raise Exception(f"Error finalizing SRS: {str(e)}")
 
-@router.post("/{session_id}/generate")
-async def generate_srs(session_id: str, request: SRSGenerateRequest, db: Session = Depends(get_session)):
-    session = db.get(SRSSession, session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    srs_data = SRSInput(**{field: getattr(session, field) for field in SRSInput.__fields__})
+@router.post("/batch/generate")
+async def batch_generate_srs(request: SRSBatchGenerateRequest):
+    """Generate documents for many sessions, streaming one NDJSON line per session as it finishes."""
+    concurrency = min(request.concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+    options = SRSGenerateRequest(style=request.style, tone=request.tone)
+
+    async def generate_one(session_id: str) -> dict:
+        async with semaphore:
+            await batch_bucket.acquire()
+            # Each task gets its own DB session so concurrent generations do not share state
+            with Session(engine) as db:
+                session = db.get(SRSSession, session_id)
+                if not session:
+                    return {"session_id": session_id, "status": "error", "error": "Session not found"}
+                try:
+                    document = await build_srs_document(session, options, db)
+                    return {"session_id": session_id, "status": "ok", "srs": document}
+                except Exception as e:
+                    db.rollback()
+                    return {"session_id": session_id, "status": "error", "error": str(e)}
+
+    async def stream_results():
+        tasks = [asyncio.create_task(generate_one(session_id)) for session_id in dict.fromkeys(request.session_ids)]
+        succeeded = failed = 0
+        try:
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                if result["status"] == "ok":
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield json.dumps(result) + "\n"
+            yield json.dumps({"done": True, "succeeded": succeeded, "failed": failed}) + "\n"
+        finally:
+            # Client went away: stop the generations that have not finished yet
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+async def build_srs_document(session: SRSSession, request: SRSGenerateRequest, db: Session) -> str:
+    """Generate (or incrementally regenerate) the SRS document and store it on the session."""
+    srs_data = session_to_input(session)
     extra = ""
     if request.style:
         extra += f"Style: {request.style}. "
     if request.tone:
         extra += f"Tone: {request.tone}."
-    prompt = format_srs_prompt(srs_data) + extra
-    try:
-        result = await srs_agent.run(prompt)
-        if not result or not hasattr(result, "output"):
+    digests = section_digests(srs_data, extra)
+    cache = load_section_cache(session.section_cache) if session.latest_proposal else None
+    stale = stale_sections(cache, digests, parse_dirty_fields(session.dirty_fields)) if cache else None
+    if stale is None or len(stale) == len(digests):
+        # No usable per-section cache, or everything changed: generate the whole document
+        with span("build_prompt"):
+            prompt = format_srs_prompt(srs_data) + extra
+        prompt_tokens = count_tokens(prompt)
+        admit(db, session, prompt_tokens)
+        # Streamed and checkpointed, so a failure near the end resumes instead of starting over.
+        # Usage is recorded per provider call inside the generation, not for joined or reused results.
+        document = await generate_document(session.session_id, session.tenant_id, prompt, session.latest_proposal)
+        if not document:
             raise HTTPException(status_code=500, detail="Failed to generate SRS")
-        session.latest_proposal = result.output
-        session.updated_at = datetime.utcnow()
-        db.add(session)
-        db.commit()
-        return {"srs": result.output}
+    else:
+        # Only re-run the sections whose inputs changed and reuse the rest
+        prompts = [format_srs_section_prompt(srs_data, number) + extra for number in stale]
+        counts = [count_tokens(prompt) for prompt in prompts]
+        prompt_tokens = sum(counts)
+        admit(db, session, prompt_tokens)
+        results = await asyncio.gather(*(
+            governor.run(srs_agent, prompt, tokens=count) for prompt, count in zip(prompts, counts)
+        ))
+        if not all(result and hasattr(result, "output") for result in results):
+            raise HTTPException(status_code=500, detail="Failed to generate SRS")
+        if results:
+            record_usage(db, session, prompt_tokens, sum(completion_tokens(result) for result in results))
+        document = assemble_document(cache, {
+            number: result.output for number, result in zip(stale, results)
+        })
+    session.latest_proposal = document
+    session.section_cache = build_section_cache(document, digests)
+    session.dirty_fields = ""
+    session.updated_at = datetime.utcnow()
+    db.add(session)
+    db.commit()
+    session_written(session.session_id)
+    return document
+
+@router.post("/{session_id}/generate")
+async def generate_srs(
+    session_id: str,
+    request: SRSGenerateRequest,
+    http_request: Request,
+    db: Session = Depends(get_session)
+):
+    session = db.get(SRSSession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    try:
+        document = await build_srs_document(session, request, db)
+        return srs_response(http_request, document)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating SRS: {str(e)}")
 
+@router.get("/{session_id}/generation", response_model=SRSGenerationResponse)
+def get_srs_generation(session_id: str, db: Session = Depends(get_session)):
+    """Progress of the latest full-document generation, including the partial text."""
+    # Read from the primary: checkpoints are written continuously and replicas lag behind
+    checkpoint = db.get(SRSGeneration, session_id)
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail="No generation found for this session")
+    return SRSGenerationResponse(
+        session_id=session_id,
+        status=checkpoint.status,
+        completed_sections=completed_sections(checkpoint.text, checkpoint.status == "complete"),
+        attempts=checkpoint.attempts,
+        error=checkpoint.error,
+        updated_at=checkpoint.updated_at,
+        srs=checkpoint.text
+    )
+
+@router.patch("/{session_id}/fields", response_model=SRSFieldsUpdateResponse)
+def update_srs_fields(session_id: str, request: SRSFieldsUpdateRequest, db: Session = Depends(get_session)):
+    session = db.get(SRSSession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    # Only the fields present in the body are written; null clears a field
+    values = column_values(request, exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    dirty = parse_dirty_fields(session.dirty_fields)
+    dirty += [field for field, value in values.items() if value != getattr(session, field) and field not in dirty]
+    try:
+        db.execute(
+            update(SRSSession)
+            .where(SRSSession.session_id == session_id)
+            .values(**values, dirty_fields=",".join(dirty), updated_at=datetime.utcnow())
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error updating fields: {str(e)}")
+    session_written(session_id)
+    if "overview_summary" in values and session.status == "complete":
+        similarity_index.mark_stale()
+    return SRSFieldsUpdateResponse(
+        session_id=session_id,
+        updated_fields=list(values),
+        dirty_fields=dirty
+    )
+
+def require_similar_sessions():
+    if not SIMILAR_SESSIONS_ENABLED:
+        raise HTTPException(status_code=403, detail="Similar-session reuse is disabled")
+
+@router.get("/{session_id}/similar", response_model=SRSSimilarResponse)
+def get_similar_sessions(
+    session_id: str,
+    limit: int = Query(5, ge=1, le=20),
+    db: Session = Depends(get_read_session)
+):
+    """Completed sessions of the same tenant that describe a similar project."""
+    require_similar_sessions()
+    session = db.get(SRSSession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    matched_on = "overview_summary"
+    text = session.overview_summary
+    if not text.strip():
+        # The overview is only extracted when the interview ends; match on the answers so far
+        matched_on = "answers"
+        text = " ".join(msg.content for msg in load_messages(db, session_id) if msg.role == "user")
+    matches = similarity_index.search(text, session.tenant_id, exclude=session_id, limit=limit) if text.strip() else []
+    return SRSSimilarResponse(session_id=session_id, matched_on=matched_on, matches=matches)
+
+PREFILL_MESSAGE = """These draft answers were copied from a similar project. Treat them as my answers \
+and only ask about what is missing or what should change for this project:
+{answers}"""
+
+@router.post("/{session_id}/prefill", response_model=SRSPrefillResponse)
+def prefill_srs_session(
+    session_id: str,
+    request: SRSPrefillRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_session)
+):
+    """Start from a similar completed session: copy its answers and its generated document."""
+    require_similar_sessions()
+    session = db.get(SRSSession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    source = db.get(SRSSession, request.source_session_id)
+    if (not source or source.session_id == session_id
+            or source.tenant_id != session.tenant_id or source.status != "complete"):
+        raise HTTPException(status_code=404, detail="Source session not found")
+    # Answers the session already has are kept; the section digests of the copied
+    # document then no longer match, so /generate only rewrites those sections
+    current = session_values(session)
+    values = {field: value for field, value in session_values(source).items() if value and not current[field]}
+    document = {}
+    if session.latest_proposal is None and source.latest_proposal is not None:
+        document = {"latest_proposal": source.latest_proposal, "section_cache": source.section_cache, "dirty_fields": ""}
+    if not values and not document:
+        raise HTTPException(status_code=400, detail="Nothing to prefill")
+    try:
+        db.execute(
+            update(SRSSession)
+            .where(SRSSession.session_id == session_id)
+            .values(**values, **document, updated_at=datetime.utcnow())
+        )
+        if values:
+            # Seed the interview with the copied answers so the chat agent does not ask for them again
+            answers = "\n".join(f"- {field}: {value}" for field, value in values.items())
+            append_messages(db, session_id, [SRSMessage(
+                session_id=session_id,
+                role="user",
+                content=PREFILL_MESSAGE.format(answers=answers),
+                sequence=len(load_messages(db, session_id)) + 1,
+                timestamp=datetime.utcnow()
+            )])
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error prefilling session: {str(e)}")
+    session_written(session_id)
+    schedule_projection(background_tasks, session_id)
+    return SRSPrefillResponse(
+        session_id=session_id,
+        source_session_id=request.source_session_id,
+        prefilled_fields=list(values),
+        srs=document.get("latest_proposal")
+    )
+
 @router.post("/{session_id}/custom")
-async def custom_prompt_srs(session_id: str, request: SRSCustomPromptRequest, db: Session = Depends(get_session)):
+async def custom_prompt_srs(
+    session_id: str,
+    request: SRSCustomPromptRequest,
+    http_request: Request,
+    db: Session = Depends(get_session)
+):
     session = db.get(SRSSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    srs_data = SRSInput(**{field: getattr(session, field) for field in SRSInput.__fields__})
-    prompt = format_srs_prompt(srs_data) + f"\n\nAdditional Instructions: {request.prompt}"
+    srs_data = session_to_input(session)
+    with span("build_prompt"):
+        prompt = format_srs_prompt(srs_data) + f"\n\nAdditional Instructions: {request.prompt}"
+    prompt_tokens = count_tokens(prompt)
+    admit(db, session, prompt_tokens)
     try:
-        result = await srs_agent.run(prompt)
+        result = await governor.run(srs_agent, prompt, tokens=prompt_tokens)
         if not result or not hasattr(result, "output"):
             raise HTTPException(status_code=500, detail="Failed to generate SRS")
-        return {"srs": result.output}
+        record_usage(db, session, prompt_tokens, completion_tokens(result))
+        db.commit()
+        session_written(session_id)
+        return srs_response(http_request, result.output)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating SRS: {str(e)}")
 
+def load_session_data(session_id: str, db: Session) -> dict:
+    """Read-through lookup of the serialized session; only cache misses touch the database."""
+    data = session_cache.get(session_id)
+    if data is None:
+        # Taken before the read: a write committed meanwhile keeps this row out of the cache
+        version = session_cache.version(session_id)
+        session = db.get(SRSSession, session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        data = session.model_dump(mode="json", exclude=SESSION_INTERNAL_FIELDS)
+        session_cache.set(session_id, data, version, shared=not db.info.get("replica"))
+    return data
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+
+def not_modified(request: Request, etag: str) -> bool:
+    """True when the poller already has this version (If-None-Match)."""
+    if_none_match = request.headers.get("if-none-match", "")
+    return if_none_match == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
 @router.get("/{session_id}")
-def get_srs_session(session_id: str, db: Session = Depends(get_session)):
+def get_srs_session(
+    session_id: str,
+    request: Request,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_session)
+):
+    data = load_session_data(session_id, db)
+    variant = ""
+    if fields:
+        # ?fields=a,b returns only the requested columns
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in data]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        variant = "-" + "+".join(selected)
+        etag = session_etag(data, variant)
+        data = {field: data[field] for field in selected}
+    else:
+        etag = session_etag(data)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    return FastJSONResponse(content=data, headers=cache_headers(etag))
+
+@router.get("/{session_id}/usage", response_model=SRSUsageResponse)
+def get_srs_usage(session_id: str, db: Session = Depends(get_read_session)):
     session = db.get(SRSSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    return session
+    return session_usage(db, session)
 
 @router.get("/{session_id}/latest")
-def get_latest_srs(session_id: str, db: Session = Depends(get_session)):
-    session = db.get(SRSSession, session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    if not session.latest_proposal:
+def get_latest_srs(session_id: str, request: Request, db: Session = Depends(get_read_session)):
+    data = load_session_data(session_id, db)
+    if not data["latest_proposal"]:
         raise HTTPException(status_code=404, detail="No generated SRS found")
-    return {"srs": session.latest_proposal}
+    etag = session_etag(data, "-latest-md" if wants_markdown(request) else "-latest")
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    return srs_response(request, data["latest_proposal"], cache_headers(etag))
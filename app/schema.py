@@ -0,0 +1,83 @@
+from operator import attrgetter
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+from sqlalchemy.orm.attributes import set_attribute
+
+# Canonical SRS schema, shared by the API, the agents and the CLI scripts
+class SRSInput(BaseModel):
+    project_name: Optional[str] = Field(None, description="Project name")
+    srs_version: Optional[str] = Field(None, description="Version of the SRS document")
+    authors: Optional[str] = Field(None, description="Authors or contributors")
+    creation_date: Optional[str] = Field(None, description="Date of creation")
+    stakeholders: Optional[str] = Field(None, description="Stakeholders involved")
+    expected_release_date: Optional[str] = Field(None, description="Expected delivery or release date")
+    overview_summary: Optional[str] = Field(None, description="Brief summary of the system")
+    main_purpose: Optional[str] = Field(None, description="Main purpose of the project")
+    intended_users: Optional[str] = Field(None, description="Intended users or beneficiaries")
+    srs_purpose: Optional[str] = Field(None, description="Purpose of this SRS document")
+    scope: Optional[str] = Field(None, description="Scope of the software system")
+    assumptions: Optional[str] = Field(None, description="Assumptions, dependencies, or constraints")
+    acronyms: Optional[str] = Field(None, description="Acronyms, abbreviations, or references to explain")
+    problem: Optional[str] = Field(None, description="Problem or challenge addressed")
+    affected_parties: Optional[str] = Field(None, description="Who is affected and in what context")
+    impacts: Optional[str] = Field(None, description="Impacts or inefficiencies caused by current state")
+    resources: Optional[str] = Field(None, description="Resources and time allocated")
+    constraints: Optional[str] = Field(None, description="Budgetary or technical constraints")
+    mvp: Optional[str] = Field(None, description="Minimum viable solution")
+    ideal_solution: Optional[str] = Field(None, description="Ideal solution if no constraints")
+    deliverables: Optional[str] = Field(None, description="Expected deliverables of the system")
+    delivery_stages: Optional[str] = Field(None, description="Important delivery stages or milestones")
+    major_features: Optional[str] = Field(None, description="Major features or capabilities planned")
+    datasheets: Optional[str] = Field(None, description="Technical specifications or datasheets")
+    db_design: Optional[str] = Field(None, description="Main entities/tables and relationships")
+    uiux: Optional[str] = Field(None, description="UI/UX design details")
+    rabbit_holes: Optional[str] = Field(None, description="Feature ideas or areas for future exploration")
+    out_of_scope: Optional[str] = Field(None, description="Explicitly out of scope items")
+    restrictions: Optional[str] = Field(None, description="Technologies/methods/tools not to be used or legal/ethical restrictions")
+
+# Field metadata, computed once at import
+SRS_FIELDS = tuple(SRSInput.model_fields)
+SRS_FIELD_DESCRIPTIONS = {name: field.description for name, field in SRSInput.model_fields.items()}
+# "- project_name\n- srs_version\n..." as listed in the interview prompt
+SRS_FIELD_PROMPT_LIST = "\n".join(f"- {name}" for name in SRS_FIELDS)
+
+_get_srs_fields = attrgetter(*SRS_FIELDS)
+
+def session_values(session) -> Dict[str, Any]:
+    """Read the SRS fields off an SRSSession row (or any object with the same attributes)."""
+    loaded = session.__dict__
+    try:
+        # Loaded ORM attributes live in the instance dict; skipping the descriptors is ~4x faster
+        return {name: loaded[name] for name in SRS_FIELDS}
+    except KeyError:
+        # Expired after a commit (or a plain object): let attribute access load them
+        return dict(zip(SRS_FIELDS, _get_srs_fields(session)))
+
+def session_to_input(session) -> SRSInput:
+    """Build an SRSInput from a stored session.
+
+    pydantic-core validates these 29 plain strings faster than `model_construct`
+    builds the model in Python, so the trusted path still goes through validation.
+    """
+    return SRSInput.model_validate(session_values(session))
+
+def input_values(data: SRSInput) -> Dict[str, Optional[str]]:
+    """Field values of an SRSInput for prompt formatting (read-only, not a copy)."""
+    return data.__dict__
+
+def column_values(data: SRSInput, exclude_unset: bool = False) -> Dict[str, str]:
+    """SRSInput values ready for the non-null session columns (None becomes "")."""
+    values = data.model_dump(exclude_unset=True) if exclude_unset else data.__dict__
+    return {name: values[name] or "" for name in SRS_FIELDS if name in values}
+
+def apply_to_session(session, data: SRSInput, keep_filled: bool = False):
+    """Copy SRSInput values onto an SRSSession row through the ORM instrumentation.
+
+    With `keep_filled`, empty values do not overwrite answers the session already has.
+    """
+    current = session_values(session) if keep_filled else None
+    for name, value in column_values(data).items():
+        if current is not None and not value and current[name]:
+            continue
+        # Bypasses SQLModel's __setattr__, which costs ~3x more per field
+        set_attribute(session, name, value)
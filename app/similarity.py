@@ -0,0 +1,136 @@
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from sqlmodel import Session, select
+from .database import engine
+from .models import SRSSession
+
+load_dotenv()
+
+# Opt-in: lists and copies other sessions of the same tenant. Only enable it when
+# X-Tenant-Id is set by a trusted gateway, not by the client.
+SIMILAR_SESSIONS_ENABLED = os.getenv("SIMILAR_SESSIONS_ENABLED", "false").lower() == "true"
+# Sessions whose overview scores below this are not offered as a starting point
+SIMILARITY_MIN_SCORE = float(os.getenv("SIMILARITY_MIN_SCORE", "0.35"))
+# Rebuild at least this often (picks up sessions completed by other workers)...
+SIMILARITY_REFRESH_SECONDS = float(os.getenv("SIMILARITY_REFRESH_SECONDS", "300"))
+# ...and at most this often when this worker completed or edited a session
+SIMILARITY_REBUILD_MIN_SECONDS = float(os.getenv("SIMILARITY_REBUILD_MIN_SECONDS", "10"))
+
+# Word unigrams and bigrams hashed into a fixed feature space
+HASH_BUCKETS = 2 ** 20
+WORD = re.compile(r"\w+")
+
+logger = logging.getLogger(__name__)
+
+def features(text: str) -> Counter:
+    """Hashed n-gram term frequencies; crc32 keeps bucket ids stable across processes."""
+    words = WORD.findall(text.lower())
+    terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return Counter(zlib.crc32(term.encode("utf-8")) % HASH_BUCKETS for term in terms)
+
+class SimilarityIndex:
+    """In-process TF-IDF index over the overview of completed sessions.
+
+    Vectors are L2-normalized and kept in an inverted index, so a query only scores the
+    sessions that share at least one n-gram with it.
+    """
+
+    def __init__(self):
+        self.entries: List[dict] = []
+        self.postings: Dict[int, List[tuple]] = {}
+        self.idf: Dict[int, float] = {}
+        # IDF of an n-gram no indexed session contains
+        self.unseen_idf = 1.0
+        self.built_at: Optional[float] = None
+        self.stale = True
+        self._lock = threading.Lock()
+
+    def mark_stale(self):
+        self.stale = True
+
+    def rebuild(self):
+        with Session(engine) as db:
+            rows = db.exec(
+                select(
+                    SRSSession.session_id, SRSSession.tenant_id,
+                    SRSSession.project_name, SRSSession.overview_summary,
+                    SRSSession.latest_proposal.isnot(None),
+                )
+                .where(SRSSession.status == "complete", SRSSession.overview_summary != "")
+            ).all()
+        counts = [features(row[3]) for row in rows]
+        df = Counter(bucket for terms in counts for bucket in terms)
+        total = len(rows)
+        idf = {bucket: math.log((1 + total) / (1 + n)) + 1 for bucket, n in df.items()}
+        postings = defaultdict(list)
+        entries = []
+        for (session_id, tenant_id, project_name, overview, has_document), terms in zip(rows, counts):
+            vector = self.weigh(terms, idf)
+            if not vector:
+                continue
+            index = len(entries)
+            entries.append({
+                "session_id": session_id,
+                "tenant_id": tenant_id,
+                "project_name": project_name,
+                "overview_summary": overview,
+                "has_document": has_document,
+            })
+            for bucket, weight in vector.items():
+                postings[bucket].append((index, weight))
+        self.entries, self.postings, self.idf = entries, dict(postings), idf
+        self.unseen_idf = math.log(1 + total) + 1
+        self.built_at = time.monotonic()
+        logger.info(f"Similarity index rebuilt over {len(entries)} completed sessions")
+
+    def ensure_fresh(self):
+        with self._lock:
+            age = time.monotonic() - self.built_at if self.built_at is not None else None
+            if age is None or age > SIMILARITY_REFRESH_SECONDS or (self.stale and age > SIMILARITY_REBUILD_MIN_SECONDS):
+                self.stale = False
+                self.rebuild()
+
+    @staticmethod
+    def weigh(terms: Counter, idf: Dict[int, float], unseen_idf: float = 0.0) -> Dict[int, float]:
+        """Sublinear TF times IDF, L2-normalized.
+
+        N-grams missing from `idf` weigh `unseen_idf` in the norm and are then dropped: they
+        match no indexed session, but still dilute the score of a query that is mostly new text.
+        """
+        vector = {bucket: (1 + math.log(tf)) * idf.get(bucket, unseen_idf) for bucket, tf in terms.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {bucket: weight / norm for bucket, weight in vector.items() if bucket in idf} if norm else {}
+
+    def search(
+        self, text: str, tenant_id: str, exclude: str = "",
+        limit: int = 5, min_score: float = SIMILARITY_MIN_SCORE
+    ) -> List[dict]:
+        """Completed sessions of the same tenant most similar to `text`, best first."""
+        self.ensure_fresh()
+        entries, postings = self.entries, self.postings
+        query = self.weigh(features(text), self.idf, self.unseen_idf)
+        scores = defaultdict(float)
+        for bucket, weight in query.items():
+            for index, doc_weight in postings.get(bucket, ()):
+                scores[index] += weight * doc_weight
+        candidates = (
+            (score, index) for index, score in scores.items()
+            if score >= min_score
+            and entries[index]["tenant_id"] == tenant_id
+            and entries[index]["session_id"] != exclude
+        )
+        return [
+            {**entries[index], "score": round(score, 4)}
+            for score, index in heapq.nlargest(limit, candidates)
+        ]
+
+similarity_index = SimilarityIndex()
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import struct
+import zlib
+from datetime import datetime
+from typing import List
+from dotenv import load_dotenv
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, update
+from .database import engine
+from .models import SRSMessage, SRSTranscript
+from .writebehind import WRITE_BEHIND, write_behind, stage_messages
+
+load_dotenv()
+
+# "rows" stores one SRSMessage row per message; "compact" packs the transcript into SRSTranscript
+TRANSCRIPT_STORAGE = os.getenv("TRANSCRIPT_STORAGE", "rows")
+
+logger = logging.getLogger(__name__)
+
+# Each record is a 4-byte big-endian length followed by a zlib-compressed JSON message
+RECORD_HEADER = struct.Struct(">I")
+
+class TranscriptConflict(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=409, detail="The session was updated by a concurrent request, please retry")
+
+def pack_messages(messages: List[SRSMessage]) -> bytes:
+    chunks = []
+    for message in messages:
+        record = zlib.compress(json.dumps({
+            "role": message.role,
+            "content": message.content,
+            "reasoning": message.reasoning,
+            "sequence": message.sequence,
+            "timestamp": message.timestamp.isoformat(),
+        }).encode("utf-8"))
+        chunks.append(RECORD_HEADER.pack(len(record)) + record)
+    return b"".join(chunks)
+
+def unpack_messages(session_id: str, data: bytes) -> List[SRSMessage]:
+    messages = []
+    offset = 0
+    while offset < len(data):
+        (length,) = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        record = json.loads(zlib.decompress(data[offset:offset + length]))
+        offset += length
+        record["timestamp"] = datetime.fromisoformat(record["timestamp"])
+        messages.append(SRSMessage(session_id=session_id, **record))
+    return messages
+
+def load_messages(db: Session, session_id: str) -> List[SRSMessage]:
+    """Return a session's messages ordered by sequence."""
+    if TRANSCRIPT_STORAGE == "compact":
+        transcript = db.get(SRSTranscript, session_id)
+        return unpack_messages(session_id, transcript.data) if transcript else []
+    messages = db.exec(
+        select(SRSMessage).where(SRSMessage.session_id == session_id).order_by(SRSMessage.sequence)
+    ).all()
+    if WRITE_BEHIND:
+        # Include messages acknowledged but not flushed yet (skipping any flushed meanwhile)
+        stored = {message.sequence for message in messages}
+        pending = [m for m in write_behind.pending_messages(session_id) if m.sequence not in stored]
+        messages = sorted(list(messages) + pending, key=lambda message: message.sequence)
+    return messages
+
+def append_messages(db: Session, session_id: str, messages: List[SRSMessage]):
+    """Stage new messages on the DB session; the caller commits."""
+    if TRANSCRIPT_STORAGE != "compact":
+        if WRITE_BEHIND:
+            stage_messages(db, messages)
+            return
+        for message in messages:
+            db.add(message)
+        return
+    chunk = pack_messages(messages)
+    now = datetime.utcnow()
+    # The caller numbered the new messages after the transcript it read; appending only
+    # on top of that transcript means a racing turn can neither lose a chunk nor reuse
+    # the same sequence numbers
+    expected = messages[0].sequence - 1
+    if db.get_bind().dialect.name == "postgresql":
+        # Appends in place, in one statement that also covers the first append
+        statement = postgresql.insert(SRSTranscript).values(
+            session_id=session_id, data=chunk, message_count=len(messages), projected_count=0, updated_at=now
+        )
+        result = db.execute(statement.on_conflict_do_update(
+            index_elements=["session_id"],
+            set_={
+                "data": SRSTranscript.data.op("||")(statement.excluded.data),
+                "message_count": SRSTranscript.message_count + statement.excluded.message_count,
+                "updated_at": now,
+            },
+            where=SRSTranscript.message_count == expected,
+        ))
+        if result.rowcount != 1:
+            raise TranscriptConflict()
+        loaded = db.identity_map.get(db.identity_key(SRSTranscript, session_id))
+        if loaded is not None:
+            db.expire(loaded)
+        return
+    transcript = db.get(SRSTranscript, session_id)
+    if transcript is None and expected == 0:
+        db.add(SRSTranscript(session_id=session_id, data=chunk, message_count=len(messages), updated_at=now))
+        try:
+            db.flush()
+        except IntegrityError:
+            # Another request wrote the first messages meanwhile
+            raise TranscriptConflict()
+        return
+    if transcript is None or transcript.message_count != expected:
+        raise TranscriptConflict()
+    # Other databases get the blob rewritten from the row already loaded
+    result = db.execute(
+        update(SRSTranscript)
+        .where(SRSTranscript.session_id == session_id, SRSTranscript.message_count == expected)
+        .values(data=transcript.data + chunk, message_count=expected + len(messages), updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise TranscriptConflict()
+    db.expire(transcript)
+
+def schedule_projection(background_tasks: BackgroundTasks, session_id: str):
+    """Keep the row-per-message table populated for analytics in compact mode."""
+    if TRANSCRIPT_STORAGE == "compact":
+        background_tasks.add_task(project_transcript, session_id)
+
+def project_transcript(session_id: str):
+    """Copy messages not yet projected from the compact transcript into SRSMessage rows."""
+    with Session(engine) as db:
+        transcript = db.get(SRSTranscript, session_id)
+        if not transcript or transcript.projected_count >= transcript.message_count:
+            return
+        projected = transcript.projected_count
+        messages = unpack_messages(session_id, transcript.data)[projected:]
+        for message in messages:
+            db.add(message)
+        # Only advance from the count we read, so concurrent projections never insert twice
+        result = db.execute(
+            update(SRSTranscript)
+            .where(SRSTranscript.session_id == session_id, SRSTranscript.projected_count == projected)
+            .values(projected_count=projected + len(messages))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            db.rollback()
+            return
+        db.commit()
+        logger.info(f"Projected {len(messages)} transcript messages for session {session_id}")
@@ -1,6 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel, Field
 from pydantic_ai import Agent
+from .schema import SRSInput
 
 # Step 1: Define proposal input model
 
@@ -8,37 +7,6 @@ from pydantic_ai import Agent
 # Step 3: Create the Gemini AI agent
 
 
-class SRSInput(BaseModel):
-    project_name: str = Field(..., description="Project name")
-    srs_version: str = Field(..., description="Version of the SRS document")
-    authors: str = Field(..., description="Authors or contributors")
-    creation_date: str = Field(..., description="Date of creation")
-    stakeholders: str = Field(..., description="Stakeholders involved")
-    expected_release_date: str = Field(..., description="Expected delivery or release date")
-    overview_summary: str = Field(..., description="Brief summary of the system")
-    main_purpose: str = Field(..., description="Main purpose of the project")
-    intended_users: str = Field(..., description="Intended users or beneficiaries")
-    srs_purpose: str = Field(..., description="Purpose of this SRS document")
-    scope: str = Field(..., description="Scope of the software system")
-    assumptions: str = Field(..., description="Assumptions, dependencies, or constraints")
-    acronyms: str = Field(..., description="Acronyms, abbreviations, or references to explain")
-    problem: str = Field(..., description="Problem or challenge addressed")
-    affected_parties: str = Field(..., description="Who is affected and in what context")
-    impacts: str = Field(..., description="Impacts or inefficiencies caused by current state")
-    resources: str = Field(..., description="Resources and time allocated")
-    constraints: str = Field(..., description="Budgetary or technical constraints")
-    mvp: str = Field(..., description="Minimum viable solution")
-    ideal_solution: str = Field(..., description="Ideal solution if no constraints")
-    deliverables: str = Field(..., description="Expected deliverables of the system")
-    delivery_stages: str = Field(..., description="Important delivery stages or milestones")
-    major_features: str = Field(..., description="Major features or capabilities planned")
-    datasheets: str = Field(..., description="Technical specifications or datasheets")
-    db_design: str = Field(..., description="Main entities/tables and relationships")
-    uiux: str = Field(..., description="UI/UX design details")
-    rabbit_holes: str = Field(..., description="Feature ideas or areas for future exploration")
-    out_of_scope: str = Field(..., description="Explicitly out of scope items")
-    restrictions: str = Field(..., description="Technologies/methods/tools not to be used or legal/ethical restrictions")
-
 # Step 6: Create the Gemini AI agent for SRS
 srs_agent = Agent("groq:llama-3.3-70b-versatile")
 
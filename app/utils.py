@@ -1,9 +1,9 @@
 import asyncio
 import json
-from typing import Optional
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
 from dotenv import load_dotenv
+from .schema import SRSInput  # SRS schema for SRS Q&A flow
 # Load environment variables
 load_dotenv()
 
@@ -12,38 +12,6 @@ class chat_output(BaseModel):
     question: str = Field(..., description="The question asked by the AI")
 
 
-# SRS schema for SRS Q&A flow
-class SRSInput(BaseModel):
-    project_name: Optional[str] = Field(None, description="Project name")
-    srs_version: Optional[str] = Field(None, description="Version of the SRS document")
-    authors: Optional[str] = Field(None, description="Authors or contributors")
-    creation_date: Optional[str] = Field(None, description="Date of creation")
-    stakeholders: Optional[str] = Field(None, description="Stakeholders involved")
-    expected_release_date: Optional[str] = Field(None, description="Expected delivery or release date")
-    overview_summary: Optional[str] = Field(None, description="Brief summary of the system")
-    main_purpose: Optional[str] = Field(None, description="Main purpose of the project")
-    intended_users: Optional[str] = Field(None, description="Intended users or beneficiaries")
-    srs_purpose: Optional[str] = Field(None, description="Purpose of this SRS document")
-    scope: Optional[str] = Field(None, description="Scope of the software system")
-    assumptions: Optional[str] = Field(None, description="Assumptions, dependencies, or constraints")
-    acronyms: Optional[str] = Field(None, description="Acronyms, abbreviations, or references to explain")
-    problem: Optional[str] = Field(None, description="Problem or challenge addressed")
-    affected_parties: Optional[str] = Field(None, description="Who is affected and in what context")
-    impacts: Optional[str] = Field(None, description="Impacts or inefficiencies caused by current state")
-    resources: Optional[str] = Field(None, description="Resources and time allocated")
-    constraints: Optional[str] = Field(None, description="Budgetary or technical constraints")
-    mvp: Optional[str] = Field(None, description="Minimum viable solution")
-    ideal_solution: Optional[str] = Field(None, description="Ideal solution if no constraints")
-    deliverables: Optional[str] = Field(None, description="Expected deliverables of the system")
-    delivery_stages: Optional[str] = Field(None, description="Important delivery stages or milestones")
-    major_features: Optional[str] = Field(None, description="Major features or capabilities planned")
-    datasheets: Optional[str] = Field(None, description="Technical specifications or datasheets")
-    db_design: Optional[str] = Field(None, description="Main entities/tables and relationships")
-    uiux: Optional[str] = Field(None, description="UI/UX design details")
-    rabbit_holes: Optional[str] = Field(None, description="Feature ideas or areas for future exploration")
-    out_of_scope: Optional[str] = Field(None, description="Explicitly out of scope items")
-    restrictions: Optional[str] = Field(None, description="Technologies/methods/tools not to be used or legal/ethical restrictions")
-
 SRS_BASE_PROMPT = """
 You are a helpful assistant collecting information to build a complete software project proposal.
 
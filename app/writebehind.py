@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import event, insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from .database import engine
+from .models import SRSMessage
+
+load_dotenv()
+
+# Opt-in: interview messages are acknowledged before they reach the database
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "false").lower() == "true"
+WRITE_BEHIND_INTERVAL_MS = int(os.getenv("WRITE_BEHIND_INTERVAL_MS", "20"))
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200"))
+# Failed flushes are retried with exponential backoff up to this delay
+WRITE_BEHIND_RETRY_MAX_SECONDS = float(os.getenv("WRITE_BEHIND_RETRY_MAX_SECONDS", "5"))
+
+logger = logging.getLogger(__name__)
+
+class WriteBehindQueue:
+    """Buffers SRSMessage inserts and flushes them as multi-row INSERTs.
+
+    Messages are handed over when the request's DB transaction commits, so a request
+    that rolls back never persists its messages. Queued and in-flight messages stay
+    visible through `pending_messages` until they are in the database, but only in this
+    process: other workers do not see them until they are flushed.
+    """
+
+    def __init__(self, interval_ms: int, batch_size: int, retry_max_seconds: float = WRITE_BEHIND_RETRY_MAX_SECONDS):
+        self.interval = interval_ms / 1000
+        self.batch_size = batch_size
+        self.retry_max = retry_max_seconds
+        self._pending: List[SRSMessage] = []
+        self._in_flight: List[SRSMessage] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._full: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"flushes": 0, "rows": 0, "dropped": 0, "requeued": 0, "failed_flushes": 0}
+
+    def enqueue(self, messages: List[SRSMessage]):
+        with self._lock:
+            self._pending.extend(messages)
+            full = len(self._pending) >= self.batch_size
+        if full and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._full.set)
+
+    def pending_messages(self, session_id: str) -> List[SRSMessage]:
+        with self._lock:
+            return [m for m in self._in_flight + self._pending if m.session_id == session_id]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending) + len(self._in_flight)
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of rows inserted.
+
+        Rows that cannot be written for good (e.g. their session was deleted) are dropped.
+        On any other error the unwritten rows go back to the front of the queue and the
+        error is raised, so the flusher retries them later.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._in_flight, self._pending = self._pending, []
+            batch = self._in_flight
+            if not batch:
+                return 0
+            rows = [message.model_dump(exclude={"id"}) for message in batch]
+            written = 0
+            failed: List[SRSMessage] = []
+            error: Optional[Exception] = None
+            try:
+                with engine.begin() as conn:
+                    for start in range(0, len(rows), self.batch_size):
+                        conn.execute(insert(SRSMessage).values(rows[start:start + self.batch_size]))
+                written = len(rows)
+            except IntegrityError as e:
+                # One bad row must not sink the whole batch
+                logger.error(f"Write-behind batch of {len(rows)} failed, retrying row by row: {e}")
+                for index, row in enumerate(rows):
+                    try:
+                        with engine.begin() as conn:
+                            conn.execute(insert(SRSMessage).values(row))
+                        written += 1
+                    except IntegrityError as row_error:
+                        self.stats["dropped"] += 1
+                        logger.error(f"Dropping message {row['session_id']}#{row['sequence']}: {row_error}")
+                    except Exception as row_error:
+                        failed, error = batch[index:], row_error
+                        break
+            except Exception as e:
+                failed, error = batch, e
+            with self._lock:
+                # Requeued ahead of newer messages so a session's turns stay in order
+                self._pending = failed + self._pending
+                self._in_flight = []
+            self.stats["flushes"] += 1
+            self.stats["rows"] += written
+            if error is not None:
+                self.stats["requeued"] += len(failed)
+                self.stats["failed_flushes"] += 1
+                raise error
+            return written
+
+    def retry_delay(self, failures: int) -> float:
+        return min(self.interval * 2 ** failures, self.retry_max)
+
+    async def _run(self):
+        failures = 0
+        while True:
+            if failures:
+                # Back off while the database is failing, even if the queue fills up
+                await asyncio.sleep(self.retry_delay(failures))
+            else:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+            if self.pending_count():
+                try:
+                    await asyncio.to_thread(self.flush)
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    logger.error(
+                        f"Write-behind flush failed, {self.pending_count()} messages requeued, "
+                        f"retrying in {self.retry_delay(failures):.2f}s: {e}"
+                    )
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Write-behind enabled: flushing every {self.interval * 1000:.0f}ms or {self.batch_size} rows")
+
+    async def stop(self):
+        """Stop the flusher and persist everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            written = await asyncio.to_thread(self.flush)
+        except Exception as e:
+            logger.error(f"Write-behind could not flush {self.pending_count()} messages on shutdown, they are lost: {e}")
+            return
+        logger.info(f"Write-behind flushed {written} messages on shutdown")
+
+    def snapshot(self) -> dict:
+        return {"enabled": WRITE_BEHIND, "pending": self.pending_count(), "stats": dict(self.stats)}
+
+write_behind = WriteBehindQueue(WRITE_BEHIND_INTERVAL_MS, WRITE_BEHIND_BATCH_SIZE)
+
+def stage_messages(db: Session, messages: List[SRSMessage]):
+    """Queue messages to be handed to the write-behind queue when `db` commits."""
+    db.info.setdefault("write_behind_messages", []).extend(messages)
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_staged_messages(db):
+    messages = db.info.pop("write_behind_messages", None)
+    if messages:
+        write_behind.enqueue(messages)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged_messages(db):
+    db.info.pop("write_behind_messages", None)
@@ -0,0 +1,53 @@
+"""Micro-benchmark for SRS schema conversions.
+
+Run from the repository root:
+
+    python -m benchmarks.schema_conversions
+"""
+import os
+import timeit
+from datetime import datetime
+
+# The agents module builds a Groq client at import; no request is ever sent here
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from app.agents import format_srs_prompt
+from app.models import SRSSession
+from app.schema import SRS_FIELDS, SRSInput, apply_to_session, session_to_input
+
+NUMBER = 20000
+
+def make_session() -> SRSSession:
+    now = datetime.utcnow()
+    return SRSSession(
+        session_id="benchmark",
+        created_at=now,
+        updated_at=now,
+        **{field: f"Example value for {field} " * 8 for field in SRS_FIELDS}
+    )
+
+def main():
+    session = make_session()
+    data = session_to_input(session)
+    cases = {
+        "row -> model (getattr loop + SRSInput(**))": lambda: SRSInput(
+            **{field: getattr(session, field) for field in SRSInput.model_fields}
+        ),
+        "row -> model (model_construct)": lambda: SRSInput.model_construct(
+            **{field: getattr(session, field) for field in SRS_FIELDS}
+        ),
+        "row -> model (session_to_input)": lambda: session_to_input(session),
+        "model -> row (dict() + setattr loop)": lambda: [
+            setattr(session, field, value) for field, value in data.dict().items()
+        ],
+        "model -> row (apply_to_session)": lambda: apply_to_session(session, data),
+        "model -> prompt (format_srs_prompt)": lambda: format_srs_prompt(data),
+        "row -> prompt (session_to_input + format)": lambda: format_srs_prompt(session_to_input(session)),
+    }
+    print(f"{'conversion':45} {'us/op':>10}")
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=NUMBER // 10, repeat=5)) / (NUMBER // 10)
+        print(f"{name:45} {seconds * 1e6:10.2f}")
+
+if __name__ == "__main__":
+    main()
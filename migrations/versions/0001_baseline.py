@@ -0,0 +1,63 @@
+"""Baseline schema: sessions and interview messages
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+Databases created by `create_all` before migrations were introduced already have
+these tables, so they are only created when missing.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SRS_COLUMNS = (
+    "project_name", "srs_version", "authors", "creation_date", "stakeholders",
+    "expected_release_date", "overview_summary", "main_purpose", "intended_users",
+    "srs_purpose", "scope", "assumptions", "acronyms", "problem", "affected_parties",
+    "impacts", "resources", "constraints", "mvp", "ideal_solution", "deliverables",
+    "delivery_stages", "major_features", "datasheets", "db_design", "uiux",
+    "rabbit_holes", "out_of_scope", "restrictions", "history", "status",
+)
+
+def existing_tables() -> set:
+    if context.is_offline_mode():
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+def upgrade():
+    tables = existing_tables()
+    if "srssession" not in tables:
+        op.create_table(
+            "srssession",
+            sa.Column("session_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            *(sa.Column(name, sqlmodel.sql.sqltypes.AutoString(), nullable=False) for name in SRS_COLUMNS),
+            sa.Column("latest_proposal", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.PrimaryKeyConstraint("session_id"),
+        )
+    if "srsmessage" not in tables:
+        op.create_table(
+            "srsmessage",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("session_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("role", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("content", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("reasoning", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column("sequence", sa.Integer(), nullable=False),
+            sa.Column("timestamp", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["session_id"], ["srssession.session_id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_srsmessage_sequence", "srsmessage", ["sequence"])
+
+def downgrade():
+    op.drop_index("ix_srsmessage_sequence", table_name="srsmessage")
+    op.drop_table("srsmessage")
+    op.drop_table("srssession")
@@ -0,0 +1,103 @@
+"""Section cache, tenant usage, compact transcripts, generation checkpoints and archive
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+Adds the srssession columns introduced after the baseline (section cache and dirty
+fields, tenant and token counters) and the tables for compact transcripts, generation
+checkpoints, tenant usage and archived sessions. Each step is skipped when `create_all`
+already made it.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Existing rows get the model defaults
+SESSION_COLUMNS = (
+    sa.Column("section_cache", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column("dirty_fields", sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default=""),
+    sa.Column("tenant_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default="default"),
+    sa.Column("prompt_tokens", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("completion_tokens", sa.Integer(), nullable=False, server_default="0"),
+)
+
+def inspect():
+    return None if context.is_offline_mode() else sa.inspect(op.get_bind())
+
+def upgrade():
+    inspector = inspect()
+    tables = set(inspector.get_table_names()) if inspector else set()
+    columns = {column["name"] for column in inspector.get_columns("srssession")} if inspector else set()
+    for column in SESSION_COLUMNS:
+        if column.name not in columns:
+            op.add_column("srssession", column)
+    session_indexes = {index["name"] for index in inspector.get_indexes("srssession")} if inspector else set()
+    if "ix_srssession_tenant_id" not in session_indexes:
+        op.create_index("ix_srssession_tenant_id", "srssession", ["tenant_id"])
+    message_indexes = {index["name"] for index in inspector.get_indexes("srsmessage")} if inspector else set()
+    if "ix_srsmessage_session_id" not in message_indexes:
+        op.create_index("ix_srsmessage_session_id", "srsmessage", ["session_id"])
+
+    if "srstranscript" not in tables:
+        op.create_table(
+            "srstranscript",
+            sa.Column("session_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+            sa.Column("message_count", sa.Integer(), nullable=False),
+            sa.Column("projected_count", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["session_id"], ["srssession.session_id"]),
+            sa.PrimaryKeyConstraint("session_id"),
+        )
+    if "srsgeneration" not in tables:
+        op.create_table(
+            "srsgeneration",
+            sa.Column("session_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("prompt_digest", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("status", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("text", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("error", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["session_id"], ["srssession.session_id"]),
+            sa.PrimaryKeyConstraint("session_id"),
+        )
+    if "tenantusage" not in tables:
+        op.create_table(
+            "tenantusage",
+            sa.Column("tenant_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("day", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("prompt_tokens", sa.Integer(), nullable=False),
+            sa.Column("completion_tokens", sa.Integer(), nullable=False),
+            sa.Column("calls", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("tenant_id", "day"),
+        )
+    if "srsarchive" not in tables:
+        op.create_table(
+            "srsarchive",
+            sa.Column("session_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("status", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("archived_at", sa.DateTime(), nullable=False),
+            sa.Column("original_bytes", sa.Integer(), nullable=False),
+            sa.Column("compressed_bytes", sa.Integer(), nullable=False),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+            sa.PrimaryKeyConstraint("session_id"),
+        )
+
+def downgrade():
+    op.drop_table("srsarchive")
+    op.drop_table("tenantusage")
+    op.drop_table("srsgeneration")
+    op.drop_table("srstranscript")
+    op.drop_index("ix_srsmessage_session_id", table_name="srsmessage")
+    op.drop_index("ix_srssession_tenant_id", table_name="srssession")
+    with op.batch_alter_table("srssession") as batch:
+        for column in reversed(SESSION_COLUMNS):
+            batch.drop_column(column.name)
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import pytest
+
+# The app reads its configuration at import: point it at throwaway SQLite files
+# (a primary and one replica stand-in) before any test module imports it
+_db_dir = tempfile.mkdtemp(prefix="srs-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/primary.db")
+os.environ.setdefault("DATABASE_REPLICA_URLS", f"sqlite:///{_db_dir}/replica.db")
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+class WatchError(Exception):
+    pass
+
+class FakePipeline:
+    """The subset of a redis-py pipeline used by SessionCache, WATCH included."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+        self.watched = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def watch(self, key):
+        self.watched = (key, self.redis.data.get(key))
+
+    def get(self, key):
+        return self.redis.data.get(key)
+
+    def multi(self):
+        pass
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value))
+
+    def incr(self, key):
+        self.commands.append(("incr", key))
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, key):
+        self.commands.append(("delete", key))
+
+    def execute(self):
+        if self.watched is not None and self.redis.data.get(self.watched[0]) != self.watched[1]:
+            raise WatchError()
+        for command, key, *args in self.commands:
+            if command == "set":
+                self.redis.set(key, *args)
+            elif command == "incr":
+                self.redis.data[key] = str(int(self.redis.data.get(key, b"0")) + 1).encode()
+            else:
+                self.redis.data.pop(key, None)
+
+class FakeRedis:
+    """In-memory stand-in for the shared Redis tier."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def attach(self, cache):
+        """Use this as the shared tier of a SessionCache."""
+        cache.redis = self
+        cache._watch_error = WatchError
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
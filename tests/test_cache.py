@@ -0,0 +1,32 @@
+from app.cache import SessionCache
+
+def test_invalidation_during_a_read_stops_the_fill():
+    cache = SessionCache(max_size=8, ttl=60)
+    version = cache.version("s")
+    # A write lands between reading the row and caching it
+    cache.invalidate("s")
+    cache.set("s", {"project_name": "stale"}, version)
+    assert cache.get("s") is None
+
+    version = cache.version("s")
+    cache.set("s", {"project_name": "fresh"}, version)
+    assert cache.get("s") == {"project_name": "fresh"}
+
+def test_invalidation_by_another_worker_stops_the_fill(fake_redis):
+    reader, writer = SessionCache(max_size=8, ttl=60), SessionCache(max_size=8, ttl=60)
+    fake_redis.attach(reader)
+    fake_redis.attach(writer)
+    version = reader.version("s")
+    writer.invalidate("s")
+    reader.set("s", {"project_name": "stale"}, version)
+    assert "srs:session:s" not in fake_redis.data
+    assert reader.get("s") is None
+
+def test_pruned_versions_still_stop_the_fill():
+    cache = SessionCache(max_size=1, ttl=60)
+    version = cache.version("s")
+    cache.invalidate("s")
+    for index in range(5000):
+        cache.invalidate(f"other-{index}")
+    cache.set("s", {"project_name": "stale"}, version)
+    assert cache.get("s") is None
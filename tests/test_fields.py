@@ -0,0 +1,46 @@
+import uuid
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.database import engine
+from app.main import app
+from app.models import SRSSession
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def session_id(client):
+    session_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    with Session(engine) as db:
+        db.add(SRSSession(session_id=session_id, created_at=now, updated_at=now, scope="Web only", acronyms="SRS"))
+        db.commit()
+    return session_id
+
+def stored(session_id: str) -> SRSSession:
+    with Session(engine) as db:
+        return db.get(SRSSession, session_id)
+
+def test_patch_marks_only_changed_fields_dirty(client, session_id):
+    response = client.patch(f"/srs/{session_id}/fields", json={"scope": "Web only", "acronyms": "SRS, API"})
+    assert response.status_code == 200
+    assert response.json()["updated_fields"] == ["scope", "acronyms"]
+    assert response.json()["dirty_fields"] == ["acronyms"]
+
+    response = client.patch(f"/srs/{session_id}/fields", json={"mvp": "Booking"})
+    assert response.json()["dirty_fields"] == ["acronyms", "mvp"]
+    session = stored(session_id)
+    assert (session.acronyms, session.mvp, session.dirty_fields) == ("SRS, API", "Booking", "acronyms,mvp")
+
+def test_patch_rejects_unknown_fields(client, session_id):
+    response = client.patch(f"/srs/{session_id}/fields", json={"scope": "Mobile", "budget": "10k"})
+    assert response.status_code == 422
+    assert stored(session_id).scope == "Web only"
+
+def test_patch_needs_at_least_one_field(client, session_id):
+    assert client.patch(f"/srs/{session_id}/fields", json={}).status_code == 400
+    assert client.patch(f"/srs/{uuid.uuid4()}/fields", json={"scope": "Mobile"}).status_code == 404
@@ -0,0 +1,91 @@
+import asyncio
+import time
+import groq
+import httpx
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.models.function import FunctionModel
+from app.ratelimit import AdaptiveConcurrency, ProviderGovernor, ProviderUnavailable
+
+def make_governor(**kwargs) -> ProviderGovernor:
+    options = dict(
+        requests_per_second=1000, request_burst=1000, tokens_per_minute=10 ** 9,
+        backoff_base=0, backoff_max=0, failure_threshold=3, reset_timeout=60,
+    )
+    options.update(kwargs)
+    return ProviderGovernor(**options)
+
+def fake_provider(failures: int):
+    """Agent whose model times out `failures` times, then answers."""
+    calls = []
+
+    def respond(messages, info):
+        calls.append(1)
+        if len(calls) <= failures:
+            raise groq.APITimeoutError(request=httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions"))
+        return ModelResponse(parts=[TextPart("ok")])
+
+    return Agent(FunctionModel(respond)), calls
+
+def test_timeouts_open_the_breaker():
+    governor = make_governor(max_retries=0)
+    agent, calls = fake_provider(failures=10)
+
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(groq.APITimeoutError):
+                await governor.run(agent, "prompt")
+        with pytest.raises(ProviderUnavailable):
+            await governor.run(agent, "prompt")
+
+    asyncio.run(scenario())
+    assert governor.breaker.state == "open"
+    assert governor.stats["failed"] == 3
+    assert governor.stats["rejected"] == 1
+    assert len(calls) == 3
+
+def test_timeouts_are_retried():
+    governor = make_governor(max_retries=3)
+    agent, calls = fake_provider(failures=2)
+    result = asyncio.run(governor.run(agent, "prompt"))
+    assert result.output == "ok"
+    assert governor.stats["retried"] == 2
+    assert governor.breaker.state == "closed"
+    assert governor.breaker.failures == 0
+
+def test_concurrency_decreases_once_per_window():
+    limiter = AdaptiveConcurrency(min_limit=1, max_limit=32, latency_target=30)
+    initial = limiter.limit
+
+    async def scenario():
+        started = time.monotonic()
+        for _ in range(16):
+            await limiter.acquire()
+        # All sixteen were in flight when the provider started throttling
+        for _ in range(16):
+            await limiter.release(started, throttled=True)
+
+    asyncio.run(scenario())
+    assert limiter.limit == pytest.approx(initial * limiter.decrease_factor)
+
+def test_cancelled_admission_frees_the_half_open_probe():
+    # A drained request bucket keeps the probe waiting for admission
+    governor = make_governor(max_retries=0, requests_per_second=0.001, request_burst=1, reset_timeout=0)
+    governor.request_bucket.tokens = 0
+    governor.breaker.record_failure()
+    governor.breaker.record_failure()
+    governor.breaker.record_failure()
+    agent, calls = fake_provider(failures=0)
+
+    async def scenario():
+        task = asyncio.create_task(governor.run(agent, "prompt"))
+        await asyncio.sleep(0.01)
+        assert governor.breaker.state == "half_open"
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert calls == []
+    assert governor.breaker.allow()
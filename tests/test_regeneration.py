@@ -0,0 +1,54 @@
+from app.regeneration import (
+    SECTION_NUMBERS, assemble_document, build_section_cache, load_section_cache,
+    section_digests, split_sections, stale_sections
+)
+from app.agents import SRS_SECTIONS
+from app.schema import SRSInput
+
+def document(label: str = "body") -> str:
+    return "Preamble\n\n" + "".join(f"# {number}. SECTION\n{label} {number}\n\n" for number in SECTION_NUMBERS)
+
+def fields_of(number: int):
+    return next(fields for n, _, fields, _ in SRS_SECTIONS if n == number)
+
+def test_split_and_assemble_round_trip():
+    text = document()
+    parts = split_sections(text)
+    assert parts["preamble"] == "Preamble\n\n"
+    assert list(parts["sections"]) == SECTION_NUMBERS
+    cache = load_section_cache(build_section_cache(text, section_digests(SRSInput())))
+    assert assemble_document(cache, {}) == text
+
+def test_assemble_replaces_only_rewritten_sections():
+    cache = load_section_cache(build_section_cache(document(), section_digests(SRSInput())))
+    rebuilt = assemble_document(cache, {3: "# 3. SECTION\nnew 3"})
+    assert split_sections(rebuilt)["sections"][3] == "# 3. SECTION\nnew 3\n\n"
+    assert rebuilt.replace("new 3", "body 3") == document()
+
+def test_documents_missing_sections_are_not_split():
+    assert split_sections("# 1. ONLY\nbody\n") is None
+    assert build_section_cache("# 1. ONLY\nbody\n", section_digests(SRSInput())) is None
+
+def test_stale_sections_follow_changed_inputs():
+    data = SRSInput(project_name="Clinic")
+    cache = load_section_cache(build_section_cache(document(), section_digests(data)))
+    assert stale_sections(cache, section_digests(data)) == []
+
+    field = fields_of(4)[0]
+    changed = section_digests(data.model_copy(update={field: "changed"}))
+    stale = stale_sections(cache, changed)
+    assert 4 in stale
+    assert all(field in fields_of(number) for number in stale)
+
+    # Style and tone apply to every section
+    assert stale_sections(cache, section_digests(data, "Tone: formal.")) == SECTION_NUMBERS
+
+def test_dirty_fields_force_their_sections():
+    data = SRSInput()
+    digests = section_digests(data)
+    cache = load_section_cache(build_section_cache(document(), digests))
+    # Edited back to the same value: the digest matches, the dirty mark still forces a rewrite
+    field = fields_of(6)[0]
+    stale = stale_sections(cache, digests, [field])
+    assert 6 in stale
+    assert stale == [number for number in SECTION_NUMBERS if field in fields_of(number)]
@@ -0,0 +1,56 @@
+import json
+import uuid
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app import database
+from app.cache import session_cache
+from app.main import app
+from app.models import SRSSession
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+def add_session(bind, session_id: str, project_name: str):
+    now = datetime.utcnow()
+    with Session(bind) as db:
+        db.add(SRSSession(session_id=session_id, created_at=now, updated_at=now, project_name=project_name))
+        db.commit()
+
+@pytest.fixture
+def session_id(client):
+    """A session whose replica copy differs from the primary, as if replication lagged."""
+    session_id = str(uuid.uuid4())
+    add_session(database.engine, session_id, "primary")
+    add_session(database.replica_engines[0], session_id, "replica")
+    return session_id
+
+def test_reads_go_to_the_replica(client, session_id):
+    assert client.get(f"/srs/{session_id}").json()["project_name"] == "replica"
+    db = next(database.get_read_session(session_id))
+    assert db.info["replica"]
+    assert db.get_bind() is database.replica_engines[0]
+
+def test_reads_after_a_write_go_to_the_primary(client, session_id):
+    response = client.patch(f"/srs/{session_id}/fields", json={"project_name": "edited"})
+    assert response.status_code == 200
+    assert client.get(f"/srs/{session_id}").json()["project_name"] == "edited"
+    db = next(database.get_read_session(session_id))
+    assert not db.info["replica"]
+    assert db.get_bind() is database.engine
+
+def test_replica_rows_stay_out_of_redis(client, session_id, fake_redis, monkeypatch):
+    monkeypatch.setattr(session_cache, "redis", None)
+    fake_redis.attach(session_cache)
+    key = f"srs:session:{session_id}"
+
+    assert client.get(f"/srs/{session_id}").json()["project_name"] == "replica"
+    assert key not in fake_redis.data
+
+    database.mark_written(session_id)
+    session_cache.invalidate(session_id)
+    assert client.get(f"/srs/{session_id}").json()["project_name"] == "primary"
+    assert json.loads(fake_redis.data[key])["project_name"] == "primary"
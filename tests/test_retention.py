@@ -0,0 +1,30 @@
+import json
+import uuid
+from datetime import datetime
+from sqlmodel import Session
+from app.database import create_db_and_tables, engine
+from app.models import SRSMessage, SRSSession, SRSTranscript
+from app.retention import session_payload
+from app.transcript import pack_messages
+
+def message(session_id: str, sequence: int) -> SRSMessage:
+    return SRSMessage(
+        session_id=session_id, role="user" if sequence % 2 else "assistant",
+        content=f"message {sequence}", sequence=sequence, timestamp=datetime.utcnow()
+    )
+
+def test_archive_uses_the_compact_transcript_ahead_of_lagging_rows():
+    create_db_and_tables()
+    session_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    messages = [message(session_id, sequence) for sequence in range(1, 5)]
+    with Session(engine) as db:
+        session = SRSSession(session_id=session_id, created_at=now, updated_at=now, status="complete")
+        db.add(session)
+        db.add(SRSTranscript(session_id=session_id, data=pack_messages(messages), message_count=4, projected_count=1, updated_at=now))
+        # Only the first message has been projected into SRSMessage rows so far
+        db.add(message(session_id, 1))
+        db.commit()
+        payload = json.loads(session_payload(db, session))
+    assert [m["sequence"] for m in payload["messages"]] == [1, 2, 3, 4]
+    assert payload["messages"][3]["content"] == "message 4"
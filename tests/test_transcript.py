@@ -0,0 +1,60 @@
+import uuid
+from datetime import datetime
+import pytest
+from sqlmodel import Session
+from app import transcript
+from app.database import create_db_and_tables, engine
+from app.models import SRSMessage, SRSSession
+from app.transcript import TranscriptConflict, append_messages, load_messages
+
+@pytest.fixture
+def session_id(monkeypatch):
+    monkeypatch.setattr(transcript, "TRANSCRIPT_STORAGE", "compact")
+    create_db_and_tables()
+    session_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    with Session(engine) as db:
+        db.add(SRSSession(session_id=session_id, created_at=now, updated_at=now))
+        db.commit()
+    return session_id
+
+def message(session_id: str, sequence: int) -> SRSMessage:
+    return SRSMessage(
+        session_id=session_id, role="user", content=f"message {sequence}",
+        sequence=sequence, timestamp=datetime.utcnow()
+    )
+
+def stored_sequences(session_id: str):
+    with Session(engine) as db:
+        return [m.sequence for m in load_messages(db, session_id)]
+
+def test_appends_accumulate(session_id):
+    for sequence in range(1, 4):
+        with Session(engine) as db:
+            load_messages(db, session_id)
+            append_messages(db, session_id, [message(session_id, sequence)])
+            db.commit()
+    assert stored_sequences(session_id) == [1, 2, 3]
+
+def test_racing_first_appends_conflict_instead_of_failing(session_id):
+    with Session(engine) as first, Session(engine) as second:
+        assert load_messages(first, session_id) == load_messages(second, session_id) == []
+        append_messages(first, session_id, [message(session_id, 1)])
+        first.commit()
+        with pytest.raises(TranscriptConflict):
+            append_messages(second, session_id, [message(session_id, 1)])
+    assert stored_sequences(session_id) == [1]
+
+def test_racing_appends_do_not_lose_a_chunk(session_id):
+    with Session(engine) as db:
+        append_messages(db, session_id, [message(session_id, 1)])
+        db.commit()
+    with Session(engine) as first, Session(engine) as second:
+        load_messages(first, session_id)
+        load_messages(second, session_id)
+        append_messages(first, session_id, [message(session_id, 2)])
+        first.commit()
+        with pytest.raises(TranscriptConflict) as error:
+            append_messages(second, session_id, [message(session_id, 2)])
+        assert error.value.status_code == 409
+    assert stored_sequences(session_id) == [1, 2]
@@ -0,0 +1,62 @@
+import uuid
+from datetime import datetime
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+from app import writebehind
+from app.database import create_db_and_tables, engine
+from app.models import SRSMessage
+from app.writebehind import WriteBehindQueue
+
+class FlakyEngine:
+    """The primary engine, except that the next `failures` transactions fail to start."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+
+    def begin(self):
+        if self.failures:
+            self.failures -= 1
+            raise OperationalError("INSERT", {}, Exception("database is unavailable"))
+        return engine.begin()
+
+@pytest.fixture
+def session_id():
+    create_db_and_tables()
+    return str(uuid.uuid4())
+
+def message(session_id: str, sequence: int, role="user") -> SRSMessage:
+    return SRSMessage(
+        session_id=session_id, role=role, content=f"message {sequence}",
+        sequence=sequence, timestamp=datetime.utcnow()
+    )
+
+def stored_sequences(session_id: str):
+    with Session(engine) as db:
+        return db.exec(
+            select(SRSMessage.sequence).where(SRSMessage.session_id == session_id).order_by(SRSMessage.id)
+        ).all()
+
+def test_failed_flush_requeues_rows_in_order(session_id, monkeypatch):
+    monkeypatch.setattr(writebehind, "engine", FlakyEngine(failures=1))
+    queue = WriteBehindQueue(interval_ms=10, batch_size=100)
+    queue.enqueue([message(session_id, 1), message(session_id, 2)])
+    with pytest.raises(OperationalError):
+        queue.flush()
+    queue.enqueue([message(session_id, 3)])
+    # Still visible to the session's next turn, ahead of newer messages
+    assert [m.sequence for m in queue.pending_messages(session_id)] == [1, 2, 3]
+    assert stored_sequences(session_id) == []
+
+    assert queue.flush() == 3
+    assert stored_sequences(session_id) == [1, 2, 3]
+    assert queue.stats["requeued"] == 2
+    assert queue.stats["dropped"] == 0
+
+def test_only_rows_rejected_for_good_are_dropped(session_id):
+    queue = WriteBehindQueue(interval_ms=10, batch_size=100)
+    queue.enqueue([message(session_id, 1), message(session_id, 2, role=None), message(session_id, 3)])
+    assert queue.flush() == 2
+    assert stored_sequences(session_id) == [1, 3]
+    assert queue.stats["dropped"] == 1
+    assert queue.pending_count() == 0